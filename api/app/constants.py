@@ -30,6 +30,7 @@ def get_valid_batch_sizes():
 
 
 VALID_BATCH_SIZES = get_valid_batch_sizes()
+VALID_BATCH_SIZE_SET = frozenset(VALID_BATCH_SIZES)
 
 # Default values
 DEFAULT_BATCH_SIZE = TOTAL_COINS
@@ -6,8 +6,10 @@ Handles all game mechanics including coin flipping, batch sending, and round man
 import logging
 import random
 import string
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from .constants import (
@@ -17,9 +19,9 @@ from .constants import (
     ROOM_INACTIVITY_THRESHOLD,
     ROUND_TYPE_BATCH_SIZES,
     TOTAL_COINS,
-    get_valid_batch_sizes,
+    VALID_BATCH_SIZE_SET,
 )
-from .models import GameState, PennyGame, PlayerTimer, RoundResult, RoundType
+from .models import GameState, PennyGame, PlayerTimer, RoundResult, RoundType, SentBatch
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,10 @@ logger = logging.getLogger(__name__)
 games: Dict[str, PennyGame] = {}
 rooms: Dict[str, List] = {}
 online_users: Dict[str, set] = {}
+action_snapshots: Dict[str, dict] = {}  # Last action frame state per room, used as the delta base
+timer_snapshots: Dict[str, Dict[str, dict]] = {}  # Formatted player timers per room, patched when a timer changes
+state_snapshots: Dict[str, dict] = {}  # Public game state per room, dropped whenever the game is touched
+state_payloads: Dict[str, bytes] = {}  # JSON encoding of state_snapshots, dropped along with it
 
 
 def issue_session_token(game: PennyGame, username: str) -> str:
@@ -74,7 +80,7 @@ def create_new_game() -> tuple[str, str, str]:
         players=[],
         pennies=[False] * TOTAL_COINS,
         created_at=now,
-        last_active_at=now,
+        last_active_at=time.monotonic(),
         host_secret=host_secret,
         batch_size=DEFAULT_BATCH_SIZE,
         player_coins={},
@@ -101,6 +107,22 @@ def remove_game(room_id: str) -> None:
     games.pop(room_id, None)
     rooms.pop(room_id, None)
     online_users.pop(room_id, None)
+    action_snapshots.pop(room_id, None)
+    timer_snapshots.pop(room_id, None)
+    state_snapshots.pop(room_id, None)
+    state_payloads.pop(room_id, None)
+
+
+def touch_game(game: PennyGame) -> None:
+    """Mark a game as active after a change, dropping its cached public state."""
+    game.last_active_at = time.monotonic()
+    invalidate_state_snapshot(game)
+
+
+def invalidate_state_snapshot(game: PennyGame) -> None:
+    """Drop the cached public state of a game without counting it as activity."""
+    state_snapshots.pop(game.room_id, None)
+    state_payloads.pop(game.room_id, None)
 
 
 def get_tails_count(game: PennyGame) -> int:
@@ -108,10 +130,7 @@ def get_tails_count(game: PennyGame) -> int:
     if not game.player_coins:
         return TOTAL_COINS  # All coins start as tails
 
-    total_tails = 0
-    for player_coins in game.player_coins.values():
-        total_tails += sum(1 for coin in player_coins if not coin)
-    return total_tails
+    return game.tails_in_play
 
 
 def get_heads_count(game: PennyGame) -> int:
@@ -119,31 +138,31 @@ def get_heads_count(game: PennyGame) -> int:
     if not game.player_coins:
         return 0
 
-    total_heads = 0
-    for player_coins in game.player_coins.values():
-        total_heads += sum(1 for coin in player_coins if coin)
-    return total_heads
+    return game.heads_in_play
+
+
+ROUND_COUNTS = {
+    RoundType.SINGLE: 1,
+    RoundType.TWO_ROUNDS: 2,
+    RoundType.THREE_ROUNDS: 3,
+}
 
 
 def get_total_rounds(round_type: RoundType) -> int:
     """Get total number of rounds for the round type."""
-    round_counts = {
-        RoundType.SINGLE: 1,
-        RoundType.TWO_ROUNDS: 2,
-        RoundType.THREE_ROUNDS: 3,
-    }
-    return round_counts.get(round_type, 1)
+    return ROUND_COUNTS.get(round_type, 1)
 
 
-def get_batch_sizes_for_round_type(round_type: RoundType, selected_batch_size: Optional[int] = None) -> List[int]:
-    """Get the batch sizes to play for a given round type."""
+@lru_cache(maxsize=64)
+def get_batch_sizes_for_round_type(round_type: RoundType, selected_batch_size: Optional[int] = None) -> Tuple[int, ...]:
+    """Get the batch sizes to play for a given round type (cached, hence an immutable tuple)."""
     if round_type == RoundType.SINGLE:
-        return [selected_batch_size] if selected_batch_size else [TOTAL_COINS]
+        return (selected_batch_size,) if selected_batch_size else (TOTAL_COINS,)
     elif round_type == RoundType.TWO_ROUNDS:
-        return ROUND_TYPE_BATCH_SIZES["two_rounds"]
+        return tuple(ROUND_TYPE_BATCH_SIZES["two_rounds"])
     elif round_type == RoundType.THREE_ROUNDS:
-        return ROUND_TYPE_BATCH_SIZES["three_rounds"]
-    return [TOTAL_COINS]
+        return tuple(ROUND_TYPE_BATCH_SIZES["three_rounds"])
+    return (TOTAL_COINS,)
 
 
 def set_round_config(
@@ -157,8 +176,7 @@ def set_round_config(
     if round_type == RoundType.SINGLE and not selected_batch_size:
         return False
 
-    valid_batch_sizes = get_valid_batch_sizes()
-    if selected_batch_size and selected_batch_size not in valid_batch_sizes:
+    if selected_batch_size and selected_batch_size not in VALID_BATCH_SIZE_SET:
         return False
 
     if required_players < 2 or required_players > 5:
@@ -169,6 +187,7 @@ def set_round_config(
     game.required_players = required_players
     game.selected_batch_size = selected_batch_size
     game.current_round = 0
+    game.total_rounds = 0
     game.round_results = []
 
     return True
@@ -182,10 +201,14 @@ def initialize_player_coins(game: PennyGame, is_new_round: bool = True) -> None:
     # Reset all player coins
     game.player_coins = {player: [] for player in game.players}
     game.sent_coins = {player: [] for player in game.players}
+    game.last_batch_counts = {}
 
     # Give all coins (as tails) to first player
     first_player = game.players[0]
     game.player_coins[first_player] = [False] * TOTAL_COINS
+    game.heads_in_play = 0
+    game.tails_in_play = TOTAL_COINS
+    game.coins_completed = 0
 
     # Initialize player timers
     _initialize_player_timers(game)
@@ -204,6 +227,29 @@ def _initialize_player_timers(game: PennyGame) -> None:
 
     for player in game.players:
         game.player_timers[player] = PlayerTimer(player=player)
+    _invalidate_timer_snapshot(game)
+
+
+def get_player_timers_snapshot(game: PennyGame) -> Dict[str, dict]:
+    """Get the formatted player timers, rebuilt only after a timer has changed."""
+    snapshot = timer_snapshots.get(game.room_id)
+    if snapshot is None:
+        snapshot = {k: v.to_dict() for k, v in game.player_timers.items()} if game.player_timers else {}
+        timer_snapshots[game.room_id] = snapshot
+    return snapshot
+
+
+def _invalidate_timer_snapshot(game: PennyGame) -> None:
+    """Drop the cached timer snapshot after any player timer changes."""
+    timer_snapshots.pop(game.room_id, None)
+
+
+def _refresh_player_timer_snapshot(game: PennyGame, player: str) -> None:
+    """Reformat only one player's entry in the cached timer snapshot after their timer changes."""
+    snapshot = timer_snapshots.get(game.room_id)
+    if snapshot is not None:
+        # Copy on write: earlier payloads may still hold the previous snapshot
+        timer_snapshots[game.room_id] = {**snapshot, player: game.player_timers[player].to_dict()}
 
 
 def start_next_round(game: PennyGame) -> bool:
@@ -217,6 +263,7 @@ def start_next_round(game: PennyGame) -> bool:
         return False  # All rounds completed
 
     # Configure round
+    game.total_rounds = len(batch_sizes)
     game.current_round += 1
     game.batch_size = batch_sizes[game.current_round - 1]
 
@@ -225,8 +272,8 @@ def start_next_round(game: PennyGame) -> bool:
     game.started_at = now
     game.ended_at = None
     game.game_duration_seconds = None
-    game.turn_timestamps = [now]
-    game.last_active_at = now
+    game.turn_timestamps = [time.monotonic()]
+    touch_game(game)
     game.state = GameState.ACTIVE
 
     # Reset game mechanics for new round
@@ -253,9 +300,10 @@ def complete_current_round(game: PennyGame) -> None:
     # End all running player timers
     for timer in game.player_timers.values():
         _end_timer_if_running(timer)
+    _invalidate_timer_snapshot(game)
 
     # Log lead time status before saving
-    logger.info(f"Completing round {game.current_round} with lead_time_seconds: {game.lead_time_seconds}")
+    logger.info("Completing round %s with lead_time_seconds: %s", game.current_round, game.lead_time_seconds)
 
     # Save round result
     round_result = RoundResult(
@@ -273,8 +321,12 @@ def complete_current_round(game: PennyGame) -> None:
 
     game.round_results.append(round_result)
 
+    # The last configured round ends the game; otherwise wait for the host to start the next one
+    game.state = GameState.RESULTS if game.current_round >= game.total_rounds else GameState.ROUND_COMPLETE
+    invalidate_state_snapshot(game)
+
     # Log the saved result
-    logger.info(f"Saved round result with lead_time_seconds: {round_result.lead_time_seconds}")
+    logger.info("Saved round result with lead_time_seconds: %s", round_result.lead_time_seconds)
 
 
 def _end_timer_if_running(timer: PlayerTimer) -> None:
@@ -291,15 +343,17 @@ def start_player_timer(game: PennyGame, player: str) -> None:
 
     if player not in game.player_timers:
         game.player_timers[player] = PlayerTimer(player=player)
+        _refresh_player_timer_snapshot(game, player)
 
     if game.player_timers[player].started_at is None:
         now = datetime.now()
         game.player_timers[player].started_at = now
+        _refresh_player_timer_snapshot(game, player)
 
         # Track the very first flip across all players for lead time
         if game.first_flip_at is None:
             game.first_flip_at = now
-            logger.info(f"First coin flip recorded at {now} by {player}")
+            logger.info("First coin flip recorded at %s by %s", now, player)
 
 
 def end_player_timer(game: PennyGame, player: str) -> None:
@@ -316,6 +370,7 @@ def end_player_timer(game: PennyGame, player: str) -> None:
     if timer.started_at and timer.ended_at is None and has_player_finished(game, player):
         timer.ended_at = datetime.now()
         timer.duration_seconds = (timer.ended_at - timer.started_at).total_seconds()
+        _refresh_player_timer_snapshot(game, player)
 
 
 def check_and_end_all_finished_timers(game: PennyGame) -> None:
@@ -371,12 +426,14 @@ def flip_coin(game: PennyGame, player: str, coin_index: int) -> bool:
 
     # Debug logging for lead time
     if game.first_flip_at:
-        logger.debug(f"First flip was at {game.first_flip_at}, current player: {player}")
+        logger.debug("First flip was at %s, current player: %s", game.first_flip_at, player)
     else:
-        logger.debug(f"This is the FIRST flip in the round by {player}")
+        logger.debug("This is the FIRST flip in the round by %s", player)
 
     # Flip the coin from tails to heads
     player_coins[coin_index] = True
+    game.heads_in_play += 1
+    game.tails_in_play -= 1
     return True
 
 
@@ -386,7 +443,7 @@ def can_send_batch(game: PennyGame, player: str) -> bool:
         return False
 
     player_coins = game.player_coins[player]
-    heads_count = sum(1 for coin in player_coins if coin)
+    heads_count = player_coins.count(True)
 
     # Can send if we have enough flipped coins for a full batch
     # OR if we have all remaining coins flipped (last partial batch)
@@ -409,7 +466,7 @@ def send_batch(game: PennyGame, player: str) -> bool:
 
     # Regular case - send to next player
     next_player = game.players[player_index + 1]
-    coins_to_send, remaining_coins = _prepare_batch_transfer(game, player)
+    sent_count, remaining_coins = _take_heads(game.player_coins[player], game.batch_size)
 
     # Update player states
     game.player_coins[player] = remaining_coins
@@ -417,10 +474,12 @@ def send_batch(game: PennyGame, player: str) -> bool:
         game.player_coins[next_player] = []
 
     # Send coins as tails to next player (they need to flip them)
-    game.player_coins[next_player].extend([False] * len(coins_to_send))
+    game.player_coins[next_player].extend([False] * sent_count)
+    game.heads_in_play -= sent_count
+    game.tails_in_play += sent_count
 
     # Track sent coins for statistics
-    _record_sent_batch(game, player, len(coins_to_send), next_player)
+    _record_sent_batch(game, player, sent_count, next_player)
 
     # Check if any players have finished
     check_and_end_all_finished_timers(game)
@@ -428,21 +487,21 @@ def send_batch(game: PennyGame, player: str) -> bool:
     return True
 
 
-def _prepare_batch_transfer(game: PennyGame, player: str) -> tuple[List[bool], List[bool]]:
-    """Prepare coins for batch transfer, separating coins to send from remaining."""
-    player_coins = game.player_coins[player]
-    coins_to_send = []
-    remaining_coins = []
-
-    heads_sent = 0
-    for coin in player_coins:
-        if coin and heads_sent < game.batch_size:  # Heads and within batch limit
-            coins_to_send.append(coin)
-            heads_sent += 1
-        else:
-            remaining_coins.append(coin)
+def _take_heads(player_coins: List[bool], limit: int) -> tuple[int, List[bool]]:
+    """Take up to `limit` heads off the front of a player's coins, stopping the scan once enough are found."""
+    taken = 0
+    cut = len(player_coins)
+    for i, coin in enumerate(player_coins):
+        if coin:
+            taken += 1
+            if taken == limit:
+                cut = i + 1
+                break
 
-    return coins_to_send, remaining_coins
+    # Every head before the cut is taken, so only the tails of that prefix stay behind
+    remaining_coins = [coin for coin in player_coins[:cut] if not coin]
+    remaining_coins.extend(player_coins[cut:])
+    return taken, remaining_coins
 
 
 def _record_sent_batch(game: PennyGame, player: str, count: int, to_player: str) -> None:
@@ -450,7 +509,8 @@ def _record_sent_batch(game: PennyGame, player: str, count: int, to_player: str)
     if player not in game.sent_coins:
         game.sent_coins[player] = []
 
-    game.sent_coins[player].append({"count": count, "timestamp": datetime.now(), "to_player": to_player})
+    game.sent_coins[player].append(SentBatch(count, time.time_ns(), to_player))
+    game.last_batch_counts[player] = count
 
 
 def send_to_completion(game: PennyGame, player: str) -> bool:
@@ -459,7 +519,7 @@ def send_to_completion(game: PennyGame, player: str) -> bool:
         return False
 
     player_coins = game.player_coins[player]
-    heads_count = sum(1 for coin in player_coins if coin)
+    heads_count = player_coins.count(True)
 
     if heads_count == 0:
         return False
@@ -474,18 +534,20 @@ def send_to_completion(game: PennyGame, player: str) -> bool:
         # Calculate lead time if we have both timestamps
         if game.first_flip_at:
             game.lead_time_seconds = (game.first_delivery_at - game.first_flip_at).total_seconds()
-            logger.info(f"First delivery recorded. Lead time: {game.lead_time_seconds:.2f} seconds")
-            logger.info(f"First flip was at: {game.first_flip_at}, First delivery at: {game.first_delivery_at}")
+            logger.info("First delivery recorded. Lead time: %.2f seconds", game.lead_time_seconds)
+            logger.info("First flip was at: %s, First delivery at: %s", game.first_flip_at, game.first_delivery_at)
         else:
             logger.warning("First delivery recorded but no first flip timestamp available!")
 
-    completed_coins, remaining_coins = _prepare_completion_transfer(player_coins, coins_to_complete)
+    completed_count, remaining_coins = _take_heads(player_coins, coins_to_complete)
 
     # Update player state
     game.player_coins[player] = remaining_coins
+    game.heads_in_play -= completed_count
+    game.coins_completed += completed_count
 
     # Track completion
-    _record_sent_batch(game, player, len(completed_coins), "COMPLETED")
+    _record_sent_batch(game, player, completed_count, "COMPLETED")
 
     # Check if any players have finished
     check_and_end_all_finished_timers(game)
@@ -493,34 +555,17 @@ def send_to_completion(game: PennyGame, player: str) -> bool:
     return True
 
 
-def _prepare_completion_transfer(player_coins: List[bool], coins_to_complete: int) -> tuple[List[bool], List[bool]]:
-    """Prepare coins for completion transfer."""
-    completed_coins = []
-    remaining_coins = []
-
-    heads_processed = 0
-    for coin in player_coins:
-        if coin and heads_processed < coins_to_complete:  # Heads and within batch limit
-            completed_coins.append(coin)
-            heads_processed += 1
-        else:
-            remaining_coins.append(coin)
-
-    return completed_coins, remaining_coins
-
-
 def is_round_over(game: PennyGame) -> bool:
     """Check if current round is complete."""
     if not game.players:
         return False
 
     # Round is over when all coins have been completed by the last player
-    total_completed = get_total_completed_coins(game)
-
-    # Check if all players have finished their work
-    all_players_finished = all(has_player_finished(game, player) for player in game.players)
+    if get_total_completed_coins(game) >= TOTAL_COINS:
+        return True
 
-    return total_completed >= TOTAL_COINS or all_players_finished
+    # Otherwise check if all players have finished their work
+    return all(has_player_finished(game, player) for player in game.players)
 
 
 def get_total_completed_coins(game: PennyGame) -> int:
@@ -528,16 +573,13 @@ def get_total_completed_coins(game: PennyGame) -> int:
     if not game.players:
         return 0
 
-    last_player = game.players[-1]
-    if last_player not in game.sent_coins:
-        return 0
+    return game.coins_completed
 
-    total = 0
-    for batch in game.sent_coins[last_player]:
-        if batch.get("to_player") == "COMPLETED":
-            total += batch["count"]
 
-    return total
+def get_action_seq(room_id: str) -> Optional[int]:
+    """Get the seq of the room's latest action frame, or None when the next one will be sent in full."""
+    snapshot = action_snapshots.get(room_id)
+    return snapshot["seq"] if snapshot else None
 
 
 def process_flip(game: PennyGame, player: str, coin_index: int) -> dict:
@@ -549,7 +591,7 @@ def process_flip(game: PennyGame, player: str, coin_index: int) -> dict:
     if not game.players:
         return {"success": False, "error": "No players in game"}
 
-    if player not in game.players:
+    if not game.has_player(player):
         return {"success": False, "error": "Player not in game"}
 
     # Execute the flip
@@ -557,7 +599,7 @@ def process_flip(game: PennyGame, player: str, coin_index: int) -> dict:
         return {"success": False, "error": "Cannot flip this coin"}
 
     # Update game state
-    game.last_active_at = datetime.now()
+    touch_game(game)
 
     # Check if any players have finished
     check_and_end_all_finished_timers(game)
@@ -567,10 +609,10 @@ def process_flip(game: PennyGame, player: str, coin_index: int) -> dict:
     game_over = False
 
     if round_complete:
-        logger.info(f"Round {game.current_round} completed after flip by {player}")
+        logger.info("Round %s completed after flip by %s", game.current_round, player)
         complete_current_round(game)
         game_over = game.state == GameState.RESULTS
-        logger.info(f"After complete_current_round: state={game.state.value}, game_over={game_over}")
+        logger.debug("After complete_current_round: state=%s, game_over=%s", game.state.value, game_over)
 
     # Ensure we have player_timers in the response
     if not hasattr(game, "player_timers") or game.player_timers is None:
@@ -588,7 +630,7 @@ def process_send(game: PennyGame, player: str) -> dict:
     if not game.players:
         return {"success": False, "error": "No players in game"}
 
-    if player not in game.players:
+    if not game.has_player(player):
         return {"success": False, "error": "Player not in game"}
 
     # Execute the send
@@ -596,23 +638,25 @@ def process_send(game: PennyGame, player: str) -> dict:
         return {"success": False, "error": "Cannot send batch - not enough flipped coins or invalid batch size"}
 
     # Update game state
-    game.last_active_at = datetime.now()
+    touch_game(game)
 
     # Check if round is over AFTER the action
     round_complete = is_round_over(game)
     game_over = False
 
     if round_complete:
-        logger.info(f"Round {game.current_round} completed after send by {player}")
+        logger.info("Round %s completed after send by %s", game.current_round, player)
         complete_current_round(game)
         game_over = game.state == GameState.RESULTS
-        logger.info(f"After complete_current_round: state={game.state.value}, game_over={game_over}")
+        logger.debug("After complete_current_round: state=%s, game_over=%s", game.state.value, game_over)
 
     # Ensure we have player_timers in the response
     if not hasattr(game, "player_timers") or game.player_timers is None:
         game.player_timers = {}
 
-    return _build_action_response(game, round_complete, game_over)
+    response = _build_action_response(game, round_complete, game_over)
+    response["batch_count"] = game.last_batch_counts[player]
+    return response
 
 
 def _build_action_response(game: PennyGame, round_complete: bool, game_over: bool) -> dict:
@@ -626,7 +670,7 @@ def _build_action_response(game: PennyGame, round_complete: bool, game_over: boo
         "total_completed": get_total_completed_coins(game),
         "state": game.state.value,
         "current_round": game.current_round,
-        "player_timers": {k: v.to_dict() for k, v in game.player_timers.items()} if game.player_timers else {},
+        "player_timers": get_player_timers_snapshot(game),
         "game_duration_seconds": game.game_duration_seconds,
         "lead_time_seconds": game.lead_time_seconds,
         "first_flip_at": game.first_flip_at.isoformat() if game.first_flip_at else None,
@@ -634,7 +678,10 @@ def _build_action_response(game: PennyGame, round_complete: bool, game_over: boo
     }
 
     logger.debug(
-        f"Action response: round_complete={round_complete}, state={game.state.value}, lead_time={game.lead_time_seconds}"
+        "Action response: round_complete=%s, state=%s, lead_time=%s",
+        round_complete,
+        game.state.value,
+        game.lead_time_seconds,
     )
     return response
 
@@ -648,12 +695,18 @@ def reset_game(game: PennyGame) -> None:
     game.turn_timestamps = []
     game.batch_size = DEFAULT_BATCH_SIZE  # Reset to default
     game.player_coins = {}
+    game.heads_in_play = 0
+    game.tails_in_play = 0
+    game.coins_completed = 0
     game.sent_coins = {}
+    game.last_batch_counts = {}
     game.player_timers = {}
+    _invalidate_timer_snapshot(game)
     game.game_duration_seconds = None
     game.current_round = 0
+    game.total_rounds = 0
     game.round_results = []
-    game.last_active_at = datetime.now()
+    touch_game(game)
     game.first_flip_at = None
     game.first_delivery_at = None
     game.lead_time_seconds = None
@@ -661,24 +714,29 @@ def reset_game(game: PennyGame) -> None:
 
 def cleanup() -> dict:
     """Clean up inactive games and players."""
-    now = datetime.now()
+    now = time.monotonic()
+    player_threshold = PLAYER_INACTIVITY_THRESHOLD.total_seconds()
+    room_threshold = ROOM_INACTIVITY_THRESHOLD.total_seconds()
     removed_games = []
 
     for room_id, game in list(games.items()):
+        idle_seconds = now - game.last_active_at
+
         # Remove inactive players
         active_players = []
         for player in game.players:
-            if now - game.last_active_at < PLAYER_INACTIVITY_THRESHOLD:
+            if idle_seconds < player_threshold:
                 active_players.append(player)
 
         if len(active_players) < len(game.players):
-            game.players = active_players
+            game.replace_players(active_players)
+            invalidate_state_snapshot(game)
             # Reinitialize player coins if game is active
             if game.state == GameState.ACTIVE:
                 initialize_player_coins(game)
 
         # Remove inactive rooms
-        if now - game.last_active_at > ROOM_INACTIVITY_THRESHOLD:
+        if idle_seconds > room_threshold:
             removed_games.append(room_id)
             remove_game(room_id)
 
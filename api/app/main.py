@@ -3,17 +3,40 @@ Main FastAPI application for the Penny Game.
 Configures CORS, middleware, and routes.
 """
 
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from .response_builder import OrjsonResponse
 from .routes import router
 from .websocket import websocket_endpoint
 
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def _configure_logging() -> None:
+    """Hand log records to a background thread so handlers never block the event loop on stream writes."""
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(QueueHandler(log_queue))
+
+
 # Configure logging for production
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+_configure_logging()
 logger = logging.getLogger(__name__)
 
 # Application configuration
@@ -37,7 +60,10 @@ ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
-    app = FastAPI(**APP_CONFIG)
+    app = FastAPI(**APP_CONFIG, default_response_class=OrjsonResponse)
+
+    # Report unexpected errors once, for every route; added before CORS so it runs inside it
+    app.add_middleware(UnexpectedErrorMiddleware)
 
     # Configure CORS
     _configure_cors(app)
@@ -52,6 +78,36 @@ def create_app() -> FastAPI:
     return app
 
 
+class UnexpectedErrorMiddleware:
+    """Turn unhandled route errors into a generic 500 inside the CORS layer, logging each traceback once."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            if response_started:
+                # Too late to replace the response (e.g. a failing background task); let the server report it
+                raise
+            logger.error("Unexpected error in %s %s", scope["method"], scope["path"], exc_info=exc)
+            response = OrjsonResponse({"detail": "Internal server error"}, status_code=500)
+            await response(scope, receive, send)
+
+
 def _configure_cors(app: FastAPI) -> None:
     """Configure CORS middleware."""
     # Allow additional origins from environment variable
@@ -5,11 +5,18 @@ Defines all Pydantic models used for data validation and serialization.
 
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, NamedTuple, Optional, Set
 
-from pydantic import BaseModel, Field
+from pydantic import AfterValidator, BaseModel, Field, PrivateAttr, StrictInt, StringConstraints
 
-from .constants import DEFAULT_BATCH_SIZE, DEFAULT_REQUIRED_PLAYERS, TOTAL_COINS, get_valid_batch_sizes
+from .constants import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_REQUIRED_PLAYERS,
+    TOTAL_COINS,
+    VALID_BATCH_SIZE_SET,
+    VALID_BATCH_SIZES,
+    get_valid_batch_sizes,
+)
 
 
 class GameState(Enum):
@@ -50,6 +57,22 @@ class PlayerTimer(BaseModel):
         json_encoders = {datetime: lambda v: v.isoformat() if v else None}
 
 
+class SentBatch(NamedTuple):
+    """A batch of coins handed to the next player, packed as a tuple."""
+
+    coins: int
+    sent_at_ns: int  # Epoch nanoseconds, converted to ISO only when serialized
+    to_player: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "count": self.coins,
+            "timestamp": datetime.fromtimestamp(self.sent_at_ns / 1e9).isoformat(),
+            "to_player": self.to_player,
+        }
+
+
 class RoundResult(BaseModel):
     """Results for a single round."""
 
@@ -84,16 +107,17 @@ class PennyGame(BaseModel):
         default_factory=lambda: [False] * TOTAL_COINS
     )  # False = Tails (starting state), True = Heads
     created_at: datetime
-    last_active_at: datetime
+    last_active_at: float  # time.monotonic() of the last activity, only used for inactivity cleanup
     started_at: Optional[datetime] = None
     ended_at: Optional[datetime] = None
-    turn_timestamps: List[datetime] = Field(default_factory=list)
+    turn_timestamps: List[float] = Field(default_factory=list)  # time.monotonic() values
     state: GameState = GameState.LOBBY
 
     # Round system configuration
     round_type: RoundType = RoundType.THREE_ROUNDS
     required_players: int = DEFAULT_REQUIRED_PLAYERS
     current_round: int = 0  # 0 = not started, 1-3 = round number
+    total_rounds: int = 0  # Rounds in the configured sequence, set when a round starts
     round_results: List[RoundResult] = Field(default_factory=list)
     batch_sizes: List[int] = Field(default_factory=lambda: get_valid_batch_sizes())
     selected_batch_size: Optional[int] = None  # For single round mode
@@ -101,7 +125,11 @@ class PennyGame(BaseModel):
     # Current round state
     batch_size: int = DEFAULT_BATCH_SIZE
     player_coins: Dict[str, List[bool]] = Field(default_factory=dict)
-    sent_coins: Dict[str, List[Dict[str, Any]]] = Field(default_factory=dict)
+    sent_coins: Dict[str, List[SentBatch]] = Field(default_factory=dict)
+    last_batch_counts: Dict[str, int] = Field(default_factory=dict)  # Size of each player's latest sent batch
+    heads_in_play: int = 0  # Running count of heads across player_coins
+    tails_in_play: int = 0  # Running count of tails across player_coins
+    coins_completed: int = 0  # Running count of coins the last player delivered this round
     player_timers: Dict[str, PlayerTimer] = Field(default_factory=dict)
     game_duration_seconds: Optional[float] = None
     first_flip_at: Optional[datetime] = None
@@ -110,195 +138,109 @@ class PennyGame(BaseModel):
     session_tokens: Dict[str, str] = Field(default_factory=dict)
     host_csrf_token: Optional[str] = None
 
+    # Membership mirrors of players/spectators; the lists keep join order
+    _player_set: Set[str] = PrivateAttr(default_factory=set)
+    _spectator_set: Set[str] = PrivateAttr(default_factory=set)
+
     class Config:
         use_enum_values = True
         json_encoders = {datetime: lambda v: v.isoformat() if v else None}
 
+    def model_post_init(self, __context: Any) -> None:
+        """Build the membership sets from the initial lists."""
+        self._player_set = set(self.players)
+        self._spectator_set = set(self.spectators)
 
-# Request Models
-class JoinRequest(BaseModel):
-    """Request to join a game."""
-
-    username: str = Field(..., min_length=1, max_length=20)
+    def has_player(self, username: str) -> bool:
+        """Check whether a user is a player."""
+        return username in self._player_set
 
-    class Config:
-        str_strip_whitespace = True
+    def has_spectator(self, username: str) -> bool:
+        """Check whether a user is a spectator."""
+        return username in self._spectator_set
 
+    def has_member(self, username: str) -> bool:
+        """Check whether a name is taken by the host, a player or a spectator."""
+        return username == self.host or username in self._player_set or username in self._spectator_set
 
-class FlipRequest(BaseModel):
-    """Request to flip a coin."""
+    def member_names(self) -> Set[str]:
+        """Get every name in the room: host, players and spectators."""
+        names = self._player_set | self._spectator_set
+        if self.host:
+            names.add(self.host)
+        return names
 
-    username: str = Field(..., min_length=1)
-    coin_index: int = Field(..., ge=0, le=TOTAL_COINS - 1, description=f"Index of coin to flip (0-{TOTAL_COINS-1})")
+    def add_player(self, username: str) -> None:
+        """Append a player to the turn order."""
+        self.players.append(username)
+        self._player_set.add(username)
 
-    class Config:
-        str_strip_whitespace = True
+    def remove_player(self, username: str) -> None:
+        """Remove a player from the turn order."""
+        self.players.remove(username)
+        self._player_set.discard(username)
 
+    def add_spectator(self, username: str) -> None:
+        """Add a spectator."""
+        self.spectators.append(username)
+        self._spectator_set.add(username)
 
-class SendRequest(BaseModel):
-    """Request to send a batch of coins."""
+    def remove_spectator(self, username: str) -> None:
+        """Remove a spectator."""
+        self.spectators.remove(username)
+        self._spectator_set.discard(username)
 
-    username: str = Field(..., min_length=1)
+    def replace_players(self, players: List[str]) -> None:
+        """Replace the whole player list, keeping the membership set in sync."""
+        self.players = players
+        self._player_set = set(players)
 
-    class Config:
-        str_strip_whitespace = True
 
-
-class RoundConfigRequest(BaseModel):
-    """Request to configure round settings."""
-
-    round_type: str = Field(..., pattern=r"^(single|two_rounds|three_rounds)$")
-    selected_batch_size: Optional[int] = Field(None, description="Required for single round type")
-    required_players: int = Field(..., ge=2, le=5, description="Number of players required (2-5)")
-
-    class Config:
-        str_strip_whitespace = True
-
-
-class ChangeRoleRequest(BaseModel):
-    """Request to change a user's role."""
-
-    username: str = Field(..., min_length=1)
-    role: str = Field(..., pattern=r"^(player|spectator)$", description="Role must be 'player' or 'spectator'")
-
-    class Config:
-        str_strip_whitespace = True
-
-
-# Response Models
-class GameStateResponse(BaseModel):
-    """Response model for game state."""
-
-    room_id: str
-    players: List[str]
-    spectators: List[str]
-    host: Optional[str]
-    pennies: List[bool]
-    created_at: datetime
-    last_active_at: datetime
-    started_at: Optional[datetime]
-    ended_at: Optional[datetime]
-    turn_timestamps: List[datetime]
-    state: str
-
-    # Round system
-    round_type: str
-    required_players: int
-    current_round: int
-    total_rounds: int
-    round_results: List[RoundResult]
-
-    # Current round
-    batch_size: int
-    player_coins: Dict[str, List[bool]]
-    sent_coins: Dict[str, List[Dict[str, Any]]]
-    total_completed: int
-    tails_remaining: int
-    player_timers: Dict[str, PlayerTimer]
-    game_duration_seconds: Optional[float]
-
-    class Config:
-        json_encoders = {datetime: lambda v: v.isoformat() if v else None}
-
-
-class ActionResponse(BaseModel):
-    """Response model for flip/send actions."""
-
-    success: bool
-    round_complete: bool
-    game_over: bool
-    player_coins: Dict[str, List[bool]]
-    sent_coins: Dict[str, List[Dict[str, Any]]]
-    total_completed: int
-    state: str
-    player_timers: Dict[str, PlayerTimer]
-    game_duration_seconds: Optional[float]
-
-    class Config:
-        json_encoders = {datetime: lambda v: v.isoformat() if v else None}
-
-
-# WebSocket Message Models
-class WebSocketMessage(BaseModel):
-    """Base model for websocket messages."""
-
-    type: str
-
-    class Config:
-        use_enum_values = True
-
-
-class GameUpdateMessage(WebSocketMessage):
-    """Game update message via websocket."""
-
-    type: str = "game_update"
-    data: dict
+# Request Models
+# Usernames are the only free-text input, so whitespace is stripped on that field alone
+Username = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
 
 
-class ActionMessage(WebSocketMessage):
-    """Action made message via websocket."""
+def _check_batch_size(batch_size: int) -> int:
+    """Accept only the divisors of TOTAL_COINS."""
+    if batch_size not in VALID_BATCH_SIZE_SET:
+        raise ValueError(f"Invalid batch size. Must be one of: {VALID_BATCH_SIZES}")
+    return batch_size
 
-    type: str = "action_made"
-    player: str
-    action: str  # "flip" or "send"
-    coin_index: Optional[int] = None  # For flip actions
-    batch_count: Optional[int] = None  # For send actions
-    player_coins: Dict[str, List[bool]]
-    sent_coins: Dict[str, List[Dict[str, Any]]]
-    total_completed: int
-    round_complete: bool
-    game_over: bool
-    state: str
-    player_timers: Dict[str, PlayerTimer]
-    game_duration_seconds: Optional[float]
 
-    class Config:
-        json_encoders = {datetime: lambda v: v.isoformat() if v else None}
+# Strict, so booleans are not taken for 1
+BatchSize = Annotated[StrictInt, AfterValidator(_check_batch_size)]
 
 
-class RoundCompleteMessage(WebSocketMessage):
-    """Round completion message."""
+class JoinRequest(BaseModel):
+    """Request to join a game."""
 
-    type: str = "round_complete"
-    round_number: int
-    next_round: Optional[int] = None
-    batch_size: Optional[int] = None
-    round_result: RoundResult
-    game_over: bool
+    username: Username = Field(..., max_length=20)
 
 
-class ActivityMessage(WebSocketMessage):
-    """User activity status message via websocket."""
+class FlipRequest(BaseModel):
+    """Request to flip a coin."""
 
-    type: str = "activity"
-    players: List[str]
-    spectators: List[str]
-    host: Optional[str]
-    activity: dict  # username -> bool (online status)
+    username: Username
+    coin_index: int = Field(..., ge=0, le=TOTAL_COINS - 1, description=f"Index of coin to flip (0-{TOTAL_COINS-1})")
 
 
-class WelcomeMessage(WebSocketMessage):
-    """Welcome message sent to newly connected clients."""
+class SendRequest(BaseModel):
+    """Request to send a batch of coins."""
 
-    type: str = "welcome"
-    room_id: str
-    username: str
-    game_state: dict
+    username: Username
 
 
-class RoundConfigUpdateMessage(WebSocketMessage):
-    """Round configuration update message via websocket."""
+class RoundConfigRequest(BaseModel):
+    """Request to configure round settings."""
 
-    type: str = "round_config_update"
-    round_type: str
-    required_players: int
-    selected_batch_size: Optional[int]
-    total_rounds: int
+    round_type: str = Field(..., pattern=r"^(single|two_rounds|three_rounds)$")
+    selected_batch_size: Optional[BatchSize] = Field(None, description="Required for single round type")
+    required_players: int = Field(..., ge=2, le=5, description="Number of players required (2-5)")
 
 
-class ErrorResponse(BaseModel):
-    """Error response model."""
+class ChangeRoleRequest(BaseModel):
+    """Request to change a user's role."""
 
-    success: bool = False
-    error: str
-    detail: Optional[str] = None
+    username: Username
+    role: str = Field(..., pattern=r"^(player|spectator)$", description="Role must be 'player' or 'spectator'")
@@ -3,268 +3,330 @@ Centralized module for building standardized API responses.
 Provides consistent response formatting across all endpoints.
 """
 
-from typing import Any, Dict, Optional
-
-from .models import PennyGame
-
-
-class GameResponseBuilder:
-    """Utility class for building standardized API responses."""
-
-    @staticmethod
-    def build_game_state_response(game: PennyGame, include_secret: bool = False) -> Dict[str, Any]:
-        """
-        Build a standardized response for the game state.
-
-        Args:
-            game: Game instance
-            include_secret: If True, includes the host's secret in the response
-
-        Returns:
-            Dict containing the standardized game state
-        """
-        from .game_logic import get_tails_count, get_total_completed_coins
-
-        response = {
-            "success": True,
-            "players": game.players,
-            "spectators": game.spectators,
-            "host": game.host,
-            "batch_size": game.batch_size,
-            "state": game.state.value,
-            "player_coins": game.player_coins,
-            "total_completed": get_total_completed_coins(game),
-            "tails_remaining": get_tails_count(game),
-            "player_timers": GameResponseBuilder._format_player_timers(game),
-            "game_duration_seconds": game.game_duration_seconds,
-            "lead_time_seconds": game.lead_time_seconds,
-        }
-
-        if include_secret and game.host_secret:
-            response["host_secret"] = game.host_secret
-
-        return response
-
-    @staticmethod
-    def build_action_response(result: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Build a standardized response for game actions.
-
-        Args:
-            result: Result of the game action
-
-        Returns:
-            Dict containing the standardized response
-        """
-        return {
-            "success": result.get("success", False),
-            "game_over": result.get("game_over", False),
-            "player_coins": result.get("player_coins", {}),
-            "sent_coins": result.get("sent_coins", {}),
-            "total_completed": result.get("total_completed", 0),
-            "state": result.get("state", "lobby"),
-            "player_timers": result.get("player_timers", {}),
-            "game_duration_seconds": result.get("game_duration_seconds"),
-        }
-
-    @staticmethod
-    def build_join_response(
-        game: PennyGame, note: Optional[str] = None, session_token: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """
-        Build a response for joining a game.
-
-        Args:
-            game: Game instance
-            note: Optional note to include in the response
-            session_token: Optional session token to bind actions/websocket connections
-
-        Returns:
-            Dict containing the join response
-        """
-        response = GameResponseBuilder.build_game_state_response(game)
-
-        if note:
-            response["note"] = note
-
-        if session_token:
-            response["session_token"] = session_token
-
-        return response
-
-    @staticmethod
-    def build_error_response(error_message: str, status_code: int = 400) -> Dict[str, Any]:
-        """
-        Build a standardized error response.
-
-        Args:
-            error_message: Error message
-            status_code: HTTP status code
-
-        Returns:
-            Dict containing the error response
-        """
-        return {"success": False, "error": error_message, "status_code": status_code}
-
-    @staticmethod
-    def build_websocket_action_data(
-        player: str, action: str, result: Dict[str, Any], extra_data: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        """
-        Build data for WebSocket action messages.
-
-        Args:
-            player: Player name
-            action: Type of action ("flip" or "send")
-            result: Result of the action
-            extra_data: Additional data (coin_index, batch_count, etc.)
-
-        Returns:
-            Dict containing the WebSocket action data
-        """
-        action_data = {
-            "type": "action_made",
-            "player": player,
-            "action": action,
-            "player_coins": result.get("player_coins", {}),
-            "sent_coins": result.get("sent_coins", {}),
-            "total_completed": result.get("total_completed", 0),
-            "game_over": result.get("game_over", False),
-            "state": result.get("state", "active"),
-            "player_timers": result.get("player_timers", {}),
-            "game_duration_seconds": result.get("game_duration_seconds"),
-        }
-
-        # Add extra data specific to the action
-        if extra_data:
-            action_data.update(extra_data)
-
-        return action_data
-
-    @staticmethod
-    def build_round_config_response(game: PennyGame, total_rounds: int) -> Dict[str, Any]:
-        """
-        Build a response for round configuration updates.
-
-        Args:
-            game: Game instance
-            total_rounds: Total number of rounds
-
-        Returns:
-            Dict containing the round config response
-        """
-        return {
-            "success": True,
-            "round_type": game.round_type.value,
-            "required_players": game.required_players,
-            "selected_batch_size": game.selected_batch_size,
-            "total_rounds": total_rounds,
-        }
-
-    @staticmethod
-    def build_start_game_response(game: PennyGame) -> Dict[str, Any]:
-        """
-        Build a response for starting the game.
-
-        Args:
-            game: Game instance
-
-        Returns:
-            Dict containing the start response
-        """
-        from .game_logic import get_tails_count, get_total_completed_coins
-
-        return {
-            "success": True,
-            "state": game.state.value,
-            "batch_size": game.batch_size,
-            "player_coins": game.player_coins,
-            "total_completed": get_total_completed_coins(game),
-            "tails_remaining": get_tails_count(game),
-            "player_timers": GameResponseBuilder._format_player_timers(game),
-            "game_duration_seconds": game.game_duration_seconds,
-        }
-
-    @staticmethod
-    def build_next_round_response(game: PennyGame, total_rounds: int) -> Dict[str, Any]:
-        """
-        Build a response for starting the next round.
-
-        Args:
-            game: Game instance
-            total_rounds: Total number of rounds
-
-        Returns:
-            Dict containing the next round response
-        """
-        return {
-            "success": True,
-            "current_round": game.current_round,
-            "total_rounds": total_rounds,
-            "batch_size": game.batch_size,
-            "state": game.state.value,
-        }
-
-    @staticmethod
-    def build_reset_response(game: PennyGame) -> Dict[str, Any]:
-        """
-        Build a response for resetting the game.
-
-        Args:
-            game: Game instance
-
-        Returns:
-            Dict containing the reset response
-        """
-        from .game_logic import get_tails_count, get_total_completed_coins
-
-        return {
-            "success": True,
-            "state": game.state.value,
-            "batch_size": game.batch_size,
-            "player_coins": game.player_coins,
-            "total_completed": get_total_completed_coins(game),
-            "tails_remaining": get_tails_count(game),
-            "player_timers": GameResponseBuilder._format_player_timers(game),
-            "game_duration_seconds": game.game_duration_seconds,
-        }
-
-    @staticmethod
-    def build_send_batch_response(result: Dict[str, Any], batch_count: int) -> Dict[str, Any]:
-        """
-        Build a response for send batch actions.
-
-        Args:
-            result: Result from process_send
-            batch_count: Number of coins in the batch
-
-        Returns:
-            Dict containing the send batch response
-        """
-        return {
-            "success": True,
-            "message": "Batch sent successfully",
-            "batch_count": batch_count,
-            "round_complete": result["round_complete"],
-            "game_over": result["game_over"],
-            "current_round": result["current_round"],
-            "total_completed": result["total_completed"],
-            "player_timers": result["player_timers"],
-            "game_duration_seconds": result["game_duration_seconds"],
-        }
-
-    @staticmethod
-    def _format_player_timers(game: PennyGame) -> Dict[str, Any]:
-        """
-        Format player timers for the response.
-
-        Args:
-            game: Game instance
-
-        Returns:
-            Dict containing the formatted timers
-        """
-        if not hasattr(game, "player_timers") or not game.player_timers:
-            return {}
-
-        return {k: v.to_dict() for k, v in game.player_timers.items()}
+from typing import Any, Dict, List, Optional
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+
+from .game_logic import (
+    get_action_seq,
+    get_player_timers_snapshot,
+    get_tails_count,
+    get_total_completed_coins,
+    state_payloads,
+    state_snapshots,
+)
+from .models import PennyGame, SentBatch
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered with orjson, which returns bytes directly."""
+
+    def render(self, content: Any) -> bytes:
+        """Serialize the response content."""
+        return orjson.dumps(content)
+
+
+def build_game_state_response(game: PennyGame, include_secret: bool = False) -> Dict[str, Any]:
+    """
+    Build a standardized response for the game state.
+
+    Args:
+        game: Game instance
+        include_secret: If True, includes the host's secret in the response
+
+    Returns:
+        Dict containing the standardized game state
+    """
+    response = {
+        "success": True,
+        "players": game.players,
+        "spectators": game.spectators,
+        "host": game.host,
+        "batch_size": game.batch_size,
+        "state": game.state.value,
+        "player_coins": game.player_coins,
+        "sent_coins": format_sent_coins(game.sent_coins),
+        "total_completed": get_total_completed_coins(game),
+        "tails_remaining": get_tails_count(game),
+        "player_timers": format_player_timers(game),
+        "game_duration_seconds": game.game_duration_seconds,
+        "lead_time_seconds": game.lead_time_seconds,
+        # Lets websocket clients that missed an action frame resume the delta stream from this state
+        "action_seq": get_action_seq(game.room_id),
+    }
+
+    if include_secret and game.host_secret:
+        response["host_secret"] = game.host_secret
+
+    return response
+
+
+def build_public_state(game: PennyGame) -> Dict[str, Any]:
+    """
+    Get the public game state, reusing the cached response until the game is touched again.
+
+    Args:
+        game: Game instance
+
+    Returns:
+        Dict containing the game state, shared between requests and therefore read-only
+    """
+    snapshot = state_snapshots.get(game.room_id)
+    if snapshot is None:
+        snapshot = state_snapshots[game.room_id] = build_game_state_response(game)
+    return snapshot
+
+
+def build_public_state_response(game: PennyGame) -> Response:
+    """
+    Get the public game state as a ready-to-send response, encoding it only once until the game is touched again.
+
+    Args:
+        game: Game instance
+
+    Returns:
+        Response carrying the cached JSON body
+    """
+    return Response(content=encode_public_state(game), media_type="application/json")
+
+
+def encode_public_state(game: PennyGame) -> bytes:
+    """
+    Get the JSON encoding of the public game state, cached alongside the state itself.
+
+    Args:
+        game: Game instance
+
+    Returns:
+        JSON bytes of the public state
+    """
+    payload = state_payloads.get(game.room_id)
+    if payload is None:
+        payload = state_payloads[game.room_id] = orjson.dumps(build_public_state(game))
+    return payload
+
+
+def build_action_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a standardized response for game actions.
+
+    Args:
+        result: Result of the game action
+
+    Returns:
+        Dict containing the standardized response
+    """
+    response = {
+        "success": result.get("success", False),
+        "game_over": result.get("game_over", False),
+        "player_coins": result.get("player_coins", {}),
+        "sent_coins": format_sent_coins(result.get("sent_coins", {})),
+        "total_completed": result.get("total_completed", 0),
+        "state": result.get("state", "lobby"),
+        "player_timers": result.get("player_timers", {}),
+    }
+
+    # The duration is only known once the round has ended, so it is omitted rather than sent as null
+    game_duration_seconds = result.get("game_duration_seconds")
+    if game_duration_seconds is not None:
+        response["game_duration_seconds"] = game_duration_seconds
+
+    return response
+
+
+def build_join_response(
+    game: PennyGame, note: Optional[str] = None, session_token: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build a response for joining a game.
+
+    Args:
+        game: Game instance
+        note: Optional note to include in the response
+        session_token: Optional session token to bind actions/websocket connections
+
+    Returns:
+        Dict containing the join response
+    """
+    response = build_game_state_response(game)
+
+    if note:
+        response["note"] = note
+
+    if session_token:
+        response["session_token"] = session_token
+
+    return response
+
+
+def build_error_response(error_message: str, status_code: int = 400) -> Dict[str, Any]:
+    """
+    Build a standardized error response.
+
+    Args:
+        error_message: Error message
+        status_code: HTTP status code
+
+    Returns:
+        Dict containing the error response
+    """
+    return {"success": False, "error": error_message, "status_code": status_code}
+
+
+def build_websocket_action_data(
+    player: str, action: str, result: Dict[str, Any], extra_data: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build data for WebSocket action messages.
+
+    Args:
+        player: Player name
+        action: Type of action ("flip" or "send")
+        result: Result of the action
+        extra_data: Additional data (coin_index, batch_count, etc.)
+
+    Returns:
+        Dict containing the WebSocket action data
+    """
+    action_data = {
+        "type": "action_made",
+        "player": player,
+        "action": action,
+        "player_coins": result.get("player_coins", {}),
+        "sent_coins": result.get("sent_coins", {}),
+        "total_completed": result.get("total_completed", 0),
+        "game_over": result.get("game_over", False),
+        "state": result.get("state", "active"),
+        "player_timers": result.get("player_timers", {}),
+    }
+
+    game_duration_seconds = result.get("game_duration_seconds")
+    if game_duration_seconds is not None:
+        action_data["game_duration_seconds"] = game_duration_seconds
+
+    # Add extra data specific to the action
+    if extra_data:
+        action_data.update((key, value) for key, value in extra_data.items() if value is not None)
+
+    return action_data
+
+
+def build_round_config_response(game: PennyGame, total_rounds: int) -> Dict[str, Any]:
+    """
+    Build a response for round configuration updates.
+
+    Args:
+        game: Game instance
+        total_rounds: Total number of rounds
+
+    Returns:
+        Dict containing the round config response
+    """
+    return {
+        "success": True,
+        "round_type": game.round_type.value,
+        "required_players": game.required_players,
+        "selected_batch_size": game.selected_batch_size,
+        "total_rounds": total_rounds,
+    }
+
+
+def build_state_snapshot(game: PennyGame) -> Dict[str, Any]:
+    """
+    Build the round state snapshot returned when the game is started or reset.
+
+    Args:
+        game: Game instance
+
+    Returns:
+        Dict containing the state snapshot
+    """
+    return {
+        "success": True,
+        "state": game.state.value,
+        "batch_size": game.batch_size,
+        "player_coins": game.player_coins,
+        "total_completed": get_total_completed_coins(game),
+        "tails_remaining": get_tails_count(game),
+        "player_timers": format_player_timers(game),
+        "game_duration_seconds": game.game_duration_seconds,
+    }
+
+
+def build_next_round_response(game: PennyGame, total_rounds: int) -> Dict[str, Any]:
+    """
+    Build a response for starting the next round.
+
+    Args:
+        game: Game instance
+        total_rounds: Total number of rounds
+
+    Returns:
+        Dict containing the next round response
+    """
+    return {
+        "success": True,
+        "current_round": game.current_round,
+        "total_rounds": total_rounds,
+        "batch_size": game.batch_size,
+        "state": game.state.value,
+    }
+
+
+def build_send_batch_response(result: Dict[str, Any], batch_count: int) -> Dict[str, Any]:
+    """
+    Build a response for send batch actions.
+
+    Args:
+        result: Result from process_send
+        batch_count: Number of coins in the batch
+
+    Returns:
+        Dict containing the send batch response
+    """
+    response = {
+        "success": True,
+        "message": "Batch sent successfully",
+        "batch_count": batch_count,
+        "round_complete": result["round_complete"],
+        "game_over": result["game_over"],
+        "current_round": result["current_round"],
+        "total_completed": result["total_completed"],
+        "player_timers": result["player_timers"],
+    }
+
+    # Same shape as the action response: the duration is omitted until the round has ended
+    if result["game_duration_seconds"] is not None:
+        response["game_duration_seconds"] = result["game_duration_seconds"]
+
+    return response
+
+
+def format_player_timers(game: PennyGame) -> Dict[str, Any]:
+    """
+    Format player timers for the response.
+
+    Args:
+        game: Game instance
+
+    Returns:
+        Dict containing the formatted timers
+    """
+    if not hasattr(game, "player_timers") or not game.player_timers:
+        return {}
+
+    return get_player_timers_snapshot(game)
+
+
+def format_sent_coins(sent_coins: Dict[str, List[SentBatch]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Expand packed sent batches into their wire format.
+
+    Args:
+        sent_coins: Sent batches per player
+
+    Returns:
+        Dict containing the formatted batches
+    """
+    return {player: [batch.to_dict() for batch in batches] for player, batches in sent_coins.items()}
@@ -3,15 +3,15 @@ API routes for the Penny Game application.
 Handles all HTTP endpoints for game management and player actions.
 """
 
-import json
 import logging
 import os
 import time
 from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-from fastapi import APIRouter, Body, HTTPException, Request, Response
+from fastapi import APIRouter, BackgroundTasks, Body, HTTPException, Request
 
+from .constants import TOTAL_COINS
 from .game_logic import (
     cleanup,
     create_new_game,
@@ -19,19 +19,50 @@ from .game_logic import (
     get_game,
     get_total_rounds,
     initialize_player_coins,
+    invalidate_state_snapshot,
     issue_session_token,
     process_flip,
     process_send,
     reset_game,
-    rooms,
     set_round_config,
     start_next_round,
+    touch_game,
     validate_session_token,
 )
-from .models import ChangeRoleRequest, FlipRequest, GameState, JoinRequest, RoundConfigRequest, RoundType, SendRequest
-from .response_builder import GameResponseBuilder
-from .validators import GameValidator
-from .websocket import broadcast_activity, broadcast_game_state, broadcast_game_update
+from .models import (
+    ChangeRoleRequest,
+    FlipRequest,
+    GameState,
+    JoinRequest,
+    PennyGame,
+    RoundConfigRequest,
+    RoundType,
+    SendRequest,
+)
+from .response_builder import (
+    OrjsonResponse,
+    build_action_response,
+    build_game_state_response,
+    build_join_response,
+    build_next_round_response,
+    build_public_state,
+    build_public_state_response,
+    build_round_config_response,
+    build_send_batch_response,
+    build_state_snapshot,
+    build_websocket_action_data,
+    encode_public_state,
+    format_player_timers,
+)
+from .validators import ERROR_STATUS_CODES, GameValidator
+from .websocket import (
+    EncodedEvent,
+    broadcast_action,
+    broadcast_activity,
+    broadcast_game_state,
+    broadcast_game_update,
+    encode_event,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -44,6 +75,21 @@ rate_limit_store = defaultdict(list)
 ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 
 
+def _require_game(room_id: str) -> PennyGame:
+    """Get a game by room ID or fail with 404."""
+    game = get_game(room_id)
+    if game is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return game
+
+
+def _require_host_game(room_id: str, request: Request) -> PennyGame:
+    """Get a game by room ID for a host-only action, rejecting unauthorized callers before anything else."""
+    game = _require_game(room_id)
+    _assert_host_credentials(game, request)
+    return game
+
+
 def _extract_session_token(request: Request) -> str:
     """Retrieve the caller's session token from headers or cookies."""
     return request.headers.get("X-Session-Token") or request.cookies.get("session_token")
@@ -55,24 +101,27 @@ def _assert_valid_session(game, username: str, token: str):
         raise HTTPException(status_code=403, detail="Invalid or missing session token")
 
 
+def _mask_credential(val: str | None) -> str:
+    """Shorten a credential to a recognizable prefix for logging."""
+    if not val:
+        return "None"
+    return f"{val[:6]}..."
+
+
 def _assert_host_credentials(game, request: Request):
     """Validate host secret and CSRF token using headers and cookies."""
     host_secret = request.headers.get("X-Host-Secret") or request.cookies.get("host_secret")
     csrf_header = request.headers.get("X-CSRF-Token")
     csrf_cookie = request.cookies.get("csrf_token")
 
-    # Log presence of credentials (masked)
-    def _mask(val: str | None) -> str:
-        if not val:
-            return "None"
-        return f"{val[:6]}..."
-
-    logger.info(
-        "Host creds check: secret=%s csrf_header=%s csrf_cookie=%s",
-        _mask(host_secret),
-        _mask(csrf_header),
-        _mask(csrf_cookie),
-    )
+    # Log presence of credentials (masked); runs on every host action, so only when debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Host creds check: secret=%s csrf_header=%s csrf_cookie=%s",
+            _mask_credential(host_secret),
+            _mask_credential(csrf_header),
+            _mask_credential(csrf_cookie),
+        )
 
     is_valid, error = GameValidator.validate_host_action(game, host_secret)
     if not is_valid:
@@ -112,6 +161,24 @@ def _has_valid_host_credentials(game, request: Request) -> bool:
     return True
 
 
+# Request validator for each player action
+PLAYER_ACTION_VALIDATORS = {
+    "flip": GameValidator.validate_flip_request,
+    "send": GameValidator.validate_send_batch_request,
+}
+
+
+def _assert_player_action_allowed(game, username: str, request: Request, action: str) -> None:
+    """Run the checks a flip or send needs, so rejected actions fail before any game logic runs."""
+    is_valid, error = GameValidator.validate_required_player_count(game)
+    if is_valid:
+        is_valid, error = PLAYER_ACTION_VALIDATORS[action](game, username)
+    if not is_valid:
+        raise HTTPException(status_code=_get_error_status_code(error), detail=error)
+
+    _assert_valid_session(game, username, _extract_session_token(request))
+
+
 def _enforce_rate_limit(request: Request, bucket: str) -> None:
     """Simple sliding-window rate limiter keyed by client IP and bucket."""
     client_ip = request.client.host if request.client else "unknown"
@@ -139,13 +206,13 @@ def _assert_admin(request: Request) -> None:
 
 
 @router.post("/game/create")
-def create_game(request: Request):
+async def create_game(request: Request):
     """Create a new game room."""
     _enforce_rate_limit(request, "create_game")
     room_id, host_secret, host_csrf_token = create_new_game()
 
     response_data = {"room_id": room_id, "host_secret": host_secret, "csrf_token": host_csrf_token}
-    response = Response(content=json.dumps(response_data), media_type="application/json")
+    response = OrjsonResponse(response_data)
 
     response.set_cookie(
         key="host_secret",
@@ -167,58 +234,49 @@ def create_game(request: Request):
         path="/",
     )
 
-    logger.info(f"Game created: {room_id}")
+    logger.info("Game created: %s", room_id)
     return response
 
 
 @router.post("/game/join/{room_id}")
-async def join_game(room_id: str, join: JoinRequest, request: Request, spectator: bool = False):
+async def join_game(
+    room_id: str, join: JoinRequest, request: Request, background_tasks: BackgroundTasks, spectator: bool = False
+):
     """Join a game as a player or spectator."""
     room_id = room_id.upper()  # Normalize for case-insensitive lookup
     _enforce_rate_limit(request, "join_game")
-    game = get_game(room_id)
+    game = _require_game(room_id)
     username = join.username
 
-    # Validate game exists
-    is_valid, error = GameValidator.validate_game_exists(game)
-    if not is_valid:
-        raise HTTPException(status_code=404, detail=error)
-
     # Validate username availability
     is_valid, error = GameValidator.validate_username_available(game, username)
     if not is_valid:
         raise HTTPException(status_code=400, detail=error)
 
-    # Initialize room if needed
-    if room_id not in rooms:
-        rooms[room_id] = []
-
-    game.last_active_at = datetime.now()
+    touch_game(game)
 
     # Handle host joining
     if game.host is None:
         game.host = username
         session_token = issue_session_token(game, username)
-        await broadcast_activity(room_id)
-        logger.info(f"Host {username} joined game {room_id}")
-        return GameResponseBuilder.build_join_response(
-            game, note="Host created the room and does not play.", session_token=session_token
-        )
+        background_tasks.add_task(broadcast_activity, room_id)
+        logger.info("Host %s joined game %s", username, room_id)
+        return build_join_response(game, note="Host created the room and does not play.", session_token=session_token)
 
     # Handle spectator joining
     if spectator:
-        return await _handle_spectator_join(game, username, room_id)
+        return _handle_spectator_join(game, username, room_id, background_tasks)
 
     # Handle player joining
-    return await _handle_player_join(game, username, room_id)
+    return _handle_player_join(game, username, room_id, background_tasks)
 
 
-async def _handle_spectator_join(game, username: str, room_id: str):
+def _handle_spectator_join(game, username: str, room_id: str, background_tasks: BackgroundTasks):
     """Handle a user joining as a spectator."""
     session_token = issue_session_token(game, username)
-    game.spectators.append(username)
-    await broadcast_activity(room_id)
-    await broadcast_game_update(
+    game.add_spectator(username)
+    background_tasks.add_task(
+        broadcast_activity,
         room_id,
         {
             "type": "user_joined",
@@ -228,19 +286,19 @@ async def _handle_spectator_join(game, username: str, room_id: str):
             "spectators": game.spectators,
         },
     )
-    logger.info(f"Spectator {username} joined game {room_id}")
-    return GameResponseBuilder.build_join_response(game, session_token=session_token)
+    logger.info("Spectator %s joined game %s", username, room_id)
+    return build_join_response(game, session_token=session_token)
 
 
-async def _handle_player_join(game, username: str, room_id: str):
+def _handle_player_join(game, username: str, room_id: str, background_tasks: BackgroundTasks):
     """Handle a user joining as a player."""
     # Check if game is full
     is_valid, error = GameValidator.validate_player_limit(game)
     if not is_valid:
         # Join as spectator if game is full
-        game.spectators.append(username)
-        await broadcast_activity(room_id)
-        await broadcast_game_update(
+        game.add_spectator(username)
+        background_tasks.add_task(
+            broadcast_activity,
             room_id,
             {
                 "type": "user_joined",
@@ -251,14 +309,14 @@ async def _handle_player_join(game, username: str, room_id: str):
                 "note": "Joined as spectator (game full)",
             },
         )
-        logger.info(f"Player {username} joined as spectator (game full) in {room_id}")
-        return GameResponseBuilder.build_join_response(game, note="Joined as spectator (game full)")
+        logger.info("Player %s joined as spectator (game full) in %s", username, room_id)
+        return build_join_response(game, note="Joined as spectator (game full)")
 
     # Add player to the game
-    game.players.append(username)
+    game.add_player(username)
     session_token = issue_session_token(game, username)
-    await broadcast_activity(room_id)
-    await broadcast_game_update(
+    background_tasks.add_task(
+        broadcast_activity,
         room_id,
         {
             "type": "user_joined",
@@ -269,28 +327,22 @@ async def _handle_player_join(game, username: str, room_id: str):
         },
     )
 
-    logger.info(f"Player {username} joined game {room_id}")
-    return GameResponseBuilder.build_join_response(game, session_token=session_token)
+    logger.info("Player %s joined game %s", username, room_id)
+    return build_join_response(game, session_token=session_token)
 
 
 @router.post("/game/round_config/{room_id}")
-async def set_round_configuration(room_id: str, req: RoundConfigRequest, request: Request):
+async def set_round_configuration(
+    room_id: str, req: RoundConfigRequest, request: Request, background_tasks: BackgroundTasks
+):
     """Set round configuration for the game (host only, lobby only)."""
     room_id = room_id.upper()  # Normalize for case-insensitive lookup
-    game = get_game(room_id)
+    game = _require_host_game(room_id, request)
 
     # Validate request
-    validations = [
-        GameValidator.validate_game_exists(game),
-        GameValidator.validate_lobby_state(game),
-    ]
-
-    is_valid, error = GameValidator.validate_multiple(validations)
+    is_valid, error = GameValidator.validate_lobby_state(game)
     if not is_valid:
-        status_code = _get_error_status_code(error)
-        raise HTTPException(status_code=status_code, detail=error)
-
-    _assert_host_credentials(game, request)
+        raise HTTPException(status_code=_get_error_status_code(error), detail=error)
 
     # Validate round configuration
     try:
@@ -309,7 +361,8 @@ async def set_round_configuration(room_id: str, req: RoundConfigRequest, request
     total_rounds = get_total_rounds(round_type)
 
     # Broadcast update
-    await broadcast_game_update(
+    background_tasks.add_task(
+        broadcast_game_update,
         room_id,
         {
             "type": "round_config_update",
@@ -320,49 +373,43 @@ async def set_round_configuration(room_id: str, req: RoundConfigRequest, request
         },
     )
 
-    logger.info(f"Round config updated in game {room_id}: {req.round_type}, {req.required_players} players")
-    return GameResponseBuilder.build_round_config_response(game, total_rounds)
+    logger.info("Round config updated in game %s: %s, %s players", room_id, req.round_type, req.required_players)
+    return build_round_config_response(game, total_rounds)
 
 
 @router.post("/game/start/{room_id}")
-async def start_game(room_id: str, request: Request):
+async def start_game(room_id: str, request: Request, background_tasks: BackgroundTasks):
     """Start the first round of the game (host only)."""
     room_id = room_id.upper()  # Normalize for case-insensitive lookup
-    game = get_game(room_id)
+    game = _require_host_game(room_id, request)
 
     # Validate request
-    validations = [
-        GameValidator.validate_game_exists(game),
-        GameValidator.validate_game_not_started(game),
-        GameValidator.validate_required_player_count(game),
-    ]
-
-    is_valid, error = GameValidator.validate_multiple(validations)
+    is_valid, error = GameValidator.validate_game_not_started(game)
     if not is_valid:
-        status_code = _get_error_status_code(error)
-        raise HTTPException(status_code=status_code, detail=error)
+        raise HTTPException(status_code=_get_error_status_code(error), detail=error)
 
-    _assert_host_credentials(game, request)
+    is_valid, error = GameValidator.validate_required_player_count(game)
+    if not is_valid:
+        raise HTTPException(status_code=_get_error_status_code(error), detail=error)
 
     # Start the first round
     if not start_next_round(game):
         raise HTTPException(status_code=400, detail="Failed to start game")
 
-    batch_sizes = get_batch_sizes_for_round_type(game.round_type, game.selected_batch_size)
-    total_rounds = len(batch_sizes)
+    total_rounds = game.total_rounds
 
     # Broadcast game start
-    await broadcast_game_state(room_id, state=GameState.ACTIVE)
-    await _broadcast_game_started(room_id, game, total_rounds)
+    background_tasks.add_task(broadcast_game_state, room_id, GameState.ACTIVE, _game_started_event(game, total_rounds))
 
-    logger.info(f"Game started: {room_id} with {len(game.players)} players, round {game.current_round}/{total_rounds}")
-    return GameResponseBuilder.build_start_game_response(game)
+    logger.info(
+        "Game started: %s with %s players, round %s/%s", room_id, len(game.players), game.current_round, total_rounds
+    )
+    return build_state_snapshot(game)
 
 
-async def _broadcast_game_started(room_id: str, game, total_rounds: int):
-    """Broadcast game started message."""
-    await broadcast_game_update(
-        room_id,
+def _game_started_event(game, total_rounds: int) -> EncodedEvent:
+    """Build the game started message."""
+    return encode_event(
         {
             "type": "game_started",
             "round_type": game.round_type.value,
@@ -372,36 +419,24 @@ async def _broadcast_game_started(room_id: str, game, total_rounds: int):
             "players": game.players,
             "player_coins": game.player_coins,
             "total_completed": 0,
-            "tails_remaining": 12,
-            "player_timers": GameResponseBuilder._format_player_timers(game),
+            "tails_remaining": TOTAL_COINS,
+            "player_timers": format_player_timers(game),
             "game_duration_seconds": game.game_duration_seconds,
             "lead_time_seconds": None,
-        },
+        }
     )
 
 
 @router.post("/game/next_round/{room_id}")
-async def start_next_round_endpoint(room_id: str, request: Request):
+async def start_next_round_endpoint(room_id: str, request: Request, background_tasks: BackgroundTasks):
     """Start the next round (host only, round_complete state only)."""
     room_id = room_id.upper()  # Normalize for case-insensitive lookup
-    game = get_game(room_id)
-
-    # Validate request
-    validations = [
-        GameValidator.validate_game_exists(game),
-    ]
-
-    is_valid, error = GameValidator.validate_multiple(validations)
-    if not is_valid:
-        status_code = _get_error_status_code(error)
-        raise HTTPException(status_code=status_code, detail=error)
-
-    _assert_host_credentials(game, request)
+    game = _require_host_game(room_id, request)
 
     # Check if we're in the right state
     if game.state != GameState.ROUND_COMPLETE:
         logger.error(
-            f"Invalid state for next round in room {room_id}: " f"Expected ROUND_COMPLETE, got {game.state.value}"
+            "Invalid state for next round in room %s: Expected ROUND_COMPLETE, got %s", room_id, game.state.value
         )
 
         # Check if we're already in active state (double-click protection)
@@ -418,28 +453,25 @@ async def start_next_round_endpoint(room_id: str, request: Request):
         )
 
     # Additional validation: check if there are more rounds to play
-    batch_sizes = get_batch_sizes_for_round_type(game.round_type, game.selected_batch_size)
-    if game.current_round >= len(batch_sizes):
+    if game.current_round >= game.total_rounds:
         raise HTTPException(status_code=400, detail="Toutes les manches ont déjà été jouées")
 
     # Start the next round
     if not start_next_round(game):
         raise HTTPException(status_code=400, detail="Impossible de démarrer la manche suivante")
 
-    total_rounds = len(batch_sizes)
+    total_rounds = game.total_rounds
 
     # Broadcast round start
-    await broadcast_game_state(room_id, state=GameState.ACTIVE)
-    await _broadcast_round_started(room_id, game, total_rounds)
+    background_tasks.add_task(broadcast_game_state, room_id, GameState.ACTIVE, _round_started_event(game, total_rounds))
 
-    logger.info(f"Next round started: {room_id}, round {game.current_round}/{total_rounds}")
-    return GameResponseBuilder.build_next_round_response(game, total_rounds)
+    logger.info("Next round started: %s, round %s/%s", room_id, game.current_round, total_rounds)
+    return build_next_round_response(game, total_rounds)
 
 
-async def _broadcast_round_started(room_id: str, game, total_rounds: int):
-    """Broadcast round started message."""
-    await broadcast_game_update(
-        room_id,
+def _round_started_event(game, total_rounds: int) -> EncodedEvent:
+    """Build the round started message."""
+    return encode_event(
         {
             "type": "round_started",
             "current_round": game.current_round,
@@ -448,34 +480,20 @@ async def _broadcast_round_started(room_id: str, game, total_rounds: int):
             "players": game.players,
             "player_coins": game.player_coins,
             "total_completed": 0,
-            "tails_remaining": 12,
-            "player_timers": GameResponseBuilder._format_player_timers(game),
+            "tails_remaining": TOTAL_COINS,
+            "player_timers": format_player_timers(game),
             "game_duration_seconds": None,
-        },
+        }
     )
 
 
 @router.post("/game/flip/{room_id}")
-async def flip_coin(room_id: str, flip: FlipRequest, request: Request):
+async def flip_coin(room_id: str, flip: FlipRequest, request: Request, background_tasks: BackgroundTasks):
     """Flip a coin in the game."""
     room_id = room_id.upper()  # Normalize for case-insensitive lookup
     _enforce_rate_limit(request, "flip")
-    game = get_game(room_id)
-
-    # Validate request
-    validations = [
-        GameValidator.validate_game_exists(game),
-        GameValidator.validate_required_player_count(game),
-        GameValidator.validate_flip_request(game, flip.username),
-    ]
-
-    is_valid, error = GameValidator.validate_multiple(validations)
-    if not is_valid:
-        status_code = _get_error_status_code(error)
-        raise HTTPException(status_code=status_code, detail=error)
-
-    token = _extract_session_token(request)
-    _assert_valid_session(game, flip.username, token)
+    game = _require_game(room_id)
+    _assert_player_action_allowed(game, flip.username, request, "flip")
 
     # Process the flip
     result = process_flip(game, flip.username, flip.coin_index)
@@ -484,119 +502,85 @@ async def flip_coin(room_id: str, flip: FlipRequest, request: Request):
         raise HTTPException(status_code=400, detail=result["error"])
 
     # Build and broadcast action data
-    action_data = GameResponseBuilder.build_websocket_action_data(
-        flip.username, "flip", result, {"coin_index": flip.coin_index}
-    )
+    action_data = build_websocket_action_data(flip.username, "flip", result, {"coin_index": flip.coin_index})
 
     # Include round_complete flag in the broadcast
     action_data["round_complete"] = result.get("round_complete", False)
     action_data["current_round"] = result.get("current_round", game.current_round)
 
-    await broadcast_game_update(room_id, action_data)
+    await broadcast_action(room_id, action_data)
 
     # Handle round completion with proper state broadcasting
     if result.get("round_complete", False):
-        logger.info(f"Round completed after flip in room {room_id}, broadcasting state change")
-        await _handle_round_completion(room_id, game, result)
+        logger.info("Round completed after flip in room %s, broadcasting state change", room_id)
+        _handle_round_completion(room_id, game, result, background_tasks)
 
-    return GameResponseBuilder.build_game_state_response(game)
+    return build_action_response(result)
 
 
 @router.post("/game/send/{room_id}")
-async def send_batch_endpoint(room_id: str, send: SendRequest, request: Request):
+async def send_batch_endpoint(room_id: str, send: SendRequest, request: Request, background_tasks: BackgroundTasks):
     """Send a batch of coins to the next player."""
     room_id = room_id.upper()  # Normalize for case-insensitive lookup
-    try:
-        _enforce_rate_limit(request, "send")
-        game = get_game(room_id)
-
-        # Validate request
-        validations = [
-            GameValidator.validate_game_exists(game),
-            GameValidator.validate_required_player_count(game),
-            GameValidator.validate_send_batch_request(game, send.username),
-        ]
-
-        is_valid, error = GameValidator.validate_multiple(validations)
-        if not is_valid:
-            status_code = _get_error_status_code(error)
-            raise HTTPException(status_code=status_code, detail=error)
-
-        token = _extract_session_token(request)
-        _assert_valid_session(game, send.username, token)
+    _enforce_rate_limit(request, "send")
+    game = _require_game(room_id)
+    _assert_player_action_allowed(game, send.username, request, "send")
 
-        if send.username not in game.players:
-            raise HTTPException(status_code=400, detail="User is not a player in this game")
+    # Process the send
+    result = process_send(game, send.username)
 
-        # Process the send
-        result = process_send(game, send.username)
-
-        if not result["success"]:
-            raise HTTPException(status_code=400, detail=result["error"])
-
-        # Calculate batch count
-        batch_count = _get_latest_batch_count(game, send.username)
-
-        # Build and broadcast action data
-        action_data = GameResponseBuilder.build_websocket_action_data(
-            send.username, "send", result, {"batch_count": batch_count}
-        )
-
-        # Include round_complete flag in the broadcast
-        action_data["round_complete"] = result.get("round_complete", False)
-        action_data["current_round"] = result.get("current_round", game.current_round)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
 
-        await broadcast_game_update(room_id, action_data)
+    batch_count = result["batch_count"]
 
-        # Handle round completion with proper state broadcasting
-        if result.get("round_complete", False):
-            logger.info(f"Round completed after send in room {room_id}, broadcasting state change")
-            await _handle_round_completion(room_id, game, result)
+    # Build and broadcast action data
+    action_data = build_websocket_action_data(send.username, "send", result, {"batch_count": batch_count})
 
-        return GameResponseBuilder.build_send_batch_response(result, batch_count)
+    # Include round_complete flag in the broadcast
+    action_data["round_complete"] = result.get("round_complete", False)
+    action_data["current_round"] = result.get("current_round", game.current_round)
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error in send_batch_endpoint: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    await broadcast_action(room_id, action_data)
 
+    # Handle round completion with proper state broadcasting
+    if result.get("round_complete", False):
+        logger.info("Round completed after send in room %s, broadcasting state change", room_id)
+        _handle_round_completion(room_id, game, result, background_tasks)
 
-def _get_latest_batch_count(game, username: str) -> int:
-    """Get the count of the latest batch sent by a player."""
-    if username in game.sent_coins and game.sent_coins[username]:
-        return game.sent_coins[username][-1]["count"]
-    return 0
+    return build_send_batch_response(result, batch_count)
 
 
-async def _handle_round_completion(room_id: str, game, result: dict):
+def _handle_round_completion(room_id: str, game, result: dict, background_tasks: BackgroundTasks):
     """Handle round completion logic and broadcasting."""
     if not result["round_complete"]:
         return
 
     if result["game_over"]:
-        await _handle_game_over(room_id, game)
+        _handle_game_over(room_id, game, background_tasks)
     else:
-        await _handle_round_complete(room_id, game)
+        _handle_round_complete(room_id, game, background_tasks)
 
 
-async def _handle_game_over(room_id: str, game):
+def _handle_game_over(room_id: str, game, background_tasks: BackgroundTasks):
     """Handle game over state."""
-    await broadcast_game_state(room_id, state=GameState.RESULTS)
-    game_data = GameResponseBuilder.build_game_state_response(game)
-    await broadcast_game_update(room_id, {"type": "game_over", "final_state": game_data})
-    logger.info(f"Game completed: {room_id}")
+    # Cached public snapshot and its JSON, shared with /game/state, so the largest frame is not encoded again
+    game_over = EncodedEvent(
+        {"type": "game_over", "final_state": build_public_state(game)},
+        text='{"type":"game_over","final_state":%s}' % encode_public_state(game).decode(),
+    )
+    background_tasks.add_task(broadcast_game_state, room_id, GameState.RESULTS, game_over)
+    logger.info("Game completed: %s", room_id)
 
 
-async def _handle_round_complete(room_id: str, game):
+def _handle_round_complete(room_id: str, game, background_tasks: BackgroundTasks):
     """Handle round complete state with proper state verification."""
     # Ensure the game state is properly set
     if game.state != GameState.ROUND_COMPLETE:
-        logger.warning(f"Expected ROUND_COMPLETE state but got {game.state} for room {room_id}")
+        logger.warning("Expected ROUND_COMPLETE state but got %s for room %s", game.state, room_id)
         # Force the state if we know the round is complete
         game.state = GameState.ROUND_COMPLETE
-
-    await broadcast_game_state(room_id, state=GameState.ROUND_COMPLETE)
+        invalidate_state_snapshot(game)
 
     round_result = game.round_results[-1] if game.round_results else None
 
@@ -609,55 +593,45 @@ async def _handle_round_complete(room_id: str, game):
     next_round = game.current_round + 1 if game.current_round < len(batch_sizes) else None
     next_batch_size = batch_sizes[game.current_round] if next_round else None
 
-    await broadcast_game_update(
+    background_tasks.add_task(
+        broadcast_game_state,
         room_id,
-        {
-            "type": "round_complete",
-            "round_number": game.current_round,
-            "next_round": next_round,
-            "batch_size": next_batch_size,
-            "round_result": round_result.dict() if round_result else None,
-            "game_over": False,
-            "game_state": game.state.value,
-            "current_round": game.current_round,
-        },
+        GameState.ROUND_COMPLETE,
+        encode_event(
+            {
+                "type": "round_complete",
+                "round_number": game.current_round,
+                "next_round": next_round,
+                "batch_size": next_batch_size,
+                "round_result": round_result.model_dump() if round_result else None,
+                "game_over": False,
+                "game_state": game.state.value,
+                "current_round": game.current_round,
+            }
+        ),
     )
-    logger.info(f"Round {game.current_round} completed: {room_id}, state: {game.state.value}")
+    logger.info("Round %s completed: %s, state: %s", game.current_round, room_id, game.state.value)
 
 
 @router.post("/game/reset/{room_id}")
-async def reset_game_endpoint(room_id: str, request: Request):
+async def reset_game_endpoint(room_id: str, request: Request, background_tasks: BackgroundTasks):
     """Reset the game to lobby state (host only)."""
     room_id = room_id.upper()  # Normalize for case-insensitive lookup
-    game = get_game(room_id)
-
-    # Validate request
-    validations = [
-        GameValidator.validate_game_exists(game),
-    ]
-
-    is_valid, error = GameValidator.validate_multiple(validations)
-    if not is_valid:
-        status_code = _get_error_status_code(error)
-        raise HTTPException(status_code=status_code, detail=error)
-
-    _assert_host_credentials(game, request)
+    game = _require_host_game(room_id, request)
 
     # Reset the game
     reset_game(game)
 
     # Broadcast reset
-    await broadcast_game_state(room_id, state=GameState.LOBBY)
-    await _broadcast_game_reset(room_id, game)
+    background_tasks.add_task(broadcast_game_state, room_id, GameState.LOBBY, _game_reset_event(game))
 
-    logger.info(f"Game reset: {room_id}")
-    return GameResponseBuilder.build_reset_response(game)
+    logger.info("Game reset: %s", room_id)
+    return build_state_snapshot(game)
 
 
-async def _broadcast_game_reset(room_id: str, game):
-    """Broadcast game reset message."""
-    await broadcast_game_update(
-        room_id,
+def _game_reset_event(game) -> EncodedEvent:
+    """Build the game reset message."""
+    return encode_event(
         {
             "type": "game_reset",
             "round_type": game.round_type.value,
@@ -667,35 +641,29 @@ async def _broadcast_game_reset(room_id: str, game):
             "state": game.state.value,
             "player_coins": game.player_coins,
             "total_completed": 0,
-            "tails_remaining": 12,
+            "tails_remaining": TOTAL_COINS,
             "player_timers": game.player_timers,
             "game_duration_seconds": game.game_duration_seconds,
-        },
+        }
     )
 
 
 @router.get("/game/state/{room_id}")
-def get_game_state(room_id: str):
+async def get_game_state(room_id: str):
     """Get the current game state."""
     room_id = room_id.upper()  # Normalize for case-insensitive lookup
-    game = get_game(room_id)
-
-    is_valid, error = GameValidator.validate_game_exists(game)
-    if not is_valid:
-        raise HTTPException(status_code=404, detail=error)
+    game = _require_game(room_id)
 
-    return GameResponseBuilder.build_game_state_response(game)
+    return build_public_state_response(game)
 
 
 @router.post("/game/change_role/{room_id}")
-async def change_role(room_id: str, req: ChangeRoleRequest = Body(...), request: Request = None):
+async def change_role(
+    room_id: str, background_tasks: BackgroundTasks, req: ChangeRoleRequest = Body(...), request: Request = None
+):
     """Change a user's role between player and spectator."""
     room_id = room_id.upper()  # Normalize for case-insensitive lookup
-    game = get_game(room_id)
-
-    is_valid, error = GameValidator.validate_game_exists(game)
-    if not is_valid:
-        raise HTTPException(status_code=404, detail=error)
+    game = _require_game(room_id)
 
     username = req.username
     new_role = req.role
@@ -705,6 +673,12 @@ async def change_role(room_id: str, req: ChangeRoleRequest = Body(...), request:
         token = _extract_session_token(request)
         _assert_valid_session(game, username, token)
 
+    # Repeated requests for the role the user already has change nothing, so skip the mutation and broadcast
+    if (new_role == "player" and game.has_player(username)) or (
+        new_role == "spectator" and game.has_spectator(username)
+    ):
+        return build_game_state_response(game)
+
     # Validate role change
     is_valid, error = GameValidator.validate_role_change(game, username, new_role)
     if not is_valid:
@@ -713,27 +687,27 @@ async def change_role(room_id: str, req: ChangeRoleRequest = Body(...), request:
     # Execute role change
     _execute_role_change(game, username, new_role)
 
-    game.last_active_at = datetime.now()
-    await broadcast_activity(room_id)
+    touch_game(game)
+    background_tasks.add_task(broadcast_activity, room_id)
 
-    logger.info(f"Role changed: {username} -> {new_role} in game {room_id}")
-    return GameResponseBuilder.build_game_state_response(game)
+    logger.info("Role changed: %s -> %s in game %s", username, new_role, room_id)
+    return build_game_state_response(game)
 
 
 def _execute_role_change(game, username: str, new_role: str):
     """Execute the role change logic."""
     if new_role == "player":
-        game.spectators.remove(username)
-        game.players.append(username)
+        game.remove_spectator(username)
+        game.add_player(username)
     elif new_role == "spectator":
-        game.players.remove(username)
-        game.spectators.append(username)
+        game.remove_player(username)
+        game.add_spectator(username)
         if game.state == GameState.ACTIVE:
             initialize_player_coins(game, is_new_round=False)
 
 
 @router.post("/cleanup")
-def cleanup_inactive_games(request: Request):
+async def cleanup_inactive_games(request: Request):
     """Clean up inactive games and players (admin only)."""
     _assert_admin(request)
     return cleanup()
@@ -741,9 +715,4 @@ def cleanup_inactive_games(request: Request):
 
 def _get_error_status_code(error: str) -> int:
     """Determine appropriate HTTP status code based on error message."""
-    if "not found" in error.lower():
-        return 404
-    elif "invalid host" in error.lower():
-        return 403
-    else:
-        return 400
+    return ERROR_STATUS_CODES.get(error, 400)
@@ -3,22 +3,21 @@ Centralized module for game data validation.
 Contains all validation logic for game states, actions, and user permissions.
 """
 
+import hmac
 from typing import Optional, Tuple
 
-from .constants import MAX_PLAYERS, get_valid_batch_sizes
+from .constants import MAX_PLAYERS, VALID_BATCH_SIZE_SET, VALID_BATCH_SIZES
 from .models import GameState, PennyGame
 
+# Validation errors that map to something other than 400 Bad Request
+ERROR_STATUS_CODES = {
+    "Invalid host secret": 403,
+}
+
 
 class GameValidator:
     """Utility class for validating game states and actions."""
 
-    @staticmethod
-    def validate_game_exists(game: Optional[PennyGame]) -> Tuple[bool, Optional[str]]:
-        """Validate that a game exists."""
-        if not game:
-            return False, "Game not found"
-        return True, None
-
     @staticmethod
     def validate_active_game(game: PennyGame, player: str) -> Tuple[bool, Optional[str]]:
         """Validate that a game is active and a player can participate."""
@@ -28,7 +27,7 @@ class GameValidator:
         if not game.players:
             return False, "No players in game"
 
-        if player not in game.players:
+        if not game.has_player(player):
             return False, "Player not in game"
 
         return True, None
@@ -36,7 +35,12 @@ class GameValidator:
     @staticmethod
     def validate_host_action(game: PennyGame, host_secret: str) -> Tuple[bool, Optional[str]]:
         """Validate that a host action is authorized."""
-        if not host_secret or host_secret != game.host_secret:
+        # Constant-time comparison so response timing does not reveal how much of the secret matched
+        if (
+            not host_secret
+            or not game.host_secret
+            or not hmac.compare_digest(host_secret.encode(), game.host_secret.encode())
+        ):
             return False, "Invalid host secret"
         return True, None
 
@@ -68,7 +72,7 @@ class GameValidator:
     @staticmethod
     def validate_username_available(game: PennyGame, username: str) -> Tuple[bool, Optional[str]]:
         """Validate that a username is available."""
-        if username == game.host or username in game.players or username in game.spectators:
+        if game.has_member(username):
             return False, "Username already taken"
         return True, None
 
@@ -82,9 +86,8 @@ class GameValidator:
     @staticmethod
     def validate_batch_size(batch_size: int) -> Tuple[bool, Optional[str]]:
         """Validate a batch size."""
-        valid_sizes = get_valid_batch_sizes()
-        if batch_size not in valid_sizes:
-            return False, f"Invalid batch size. Must be one of: {valid_sizes}"
+        if batch_size not in VALID_BATCH_SIZE_SET:
+            return False, f"Invalid batch size. Must be one of: {VALID_BATCH_SIZES}"
         return True, None
 
     @staticmethod
@@ -108,7 +111,7 @@ class GameValidator:
             return False, "Host role cannot be changed"
 
         if new_role == "player":
-            if username not in game.spectators:
+            if not game.has_spectator(username):
                 return False, "User is not a spectator"
 
             is_valid, error = GameValidator.validate_player_limit(game)
@@ -116,7 +119,7 @@ class GameValidator:
                 return False, error
 
         elif new_role == "spectator":
-            if username not in game.players:
+            if not game.has_player(username):
                 return False, "User is not a player"
         else:
             return False, "Invalid role"
@@ -140,7 +143,7 @@ class GameValidator:
     @staticmethod
     def validate_flip_request(game: PennyGame, player: str) -> Tuple[bool, Optional[str]]:
         """Validate a coin flip request."""
-        # Uses the same validation as batch send
+        # Flips have the same preconditions as batch sends: an active game and a non-host player in it
         return GameValidator.validate_send_batch_request(game, player)
 
     @staticmethod
@@ -168,19 +171,3 @@ class GameValidator:
             return False, f"Required players must be between 2 and {MAX_PLAYERS}"
 
         return True, None
-
-    @staticmethod
-    def validate_multiple(validations: list) -> Tuple[bool, Optional[str]]:
-        """
-        Run multiple validations and return the first failure.
-
-        Args:
-            validations: List of tuples (is_valid, error_message)
-
-        Returns:
-            Tuple (is_valid, error_message)
-        """
-        for is_valid, error in validations:
-            if not is_valid:
-                return False, error
-        return True, None
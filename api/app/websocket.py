@@ -3,13 +3,18 @@ WebSocket functionality for real-time communication in the Penny Game.
 Handles client connections, message broadcasting, and connection management.
 """
 
-import json
+import asyncio
 import logging
 from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional, Set, Union
 
+import msgpack
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
 
 from .game_logic import (
+    action_snapshots,
     get_game,
     get_tails_count,
     get_total_completed_coins,
@@ -18,6 +23,8 @@ from .game_logic import (
     rooms,
     validate_session_token,
 )
+from .models import GameState
+from .response_builder import format_sent_coins
 
 logger = logging.getLogger(__name__)
 
@@ -31,83 +38,275 @@ CLOSE_CODE_HOST_LEFT = 4002
 CLOSE_CODE_UNAUTHORIZED = 4403
 CLOSE_CODE_MESSAGE_TOO_LARGE = 4400
 
+# Per-player maps of action frames that are sent as deltas between consecutive actions
+ACTION_DELTA_FIELDS = ("player_coins", "sent_coins", "player_timers")
+# Frame types that carry action deltas; any other frame resets the room's delta base
+DELTA_FRAME_TYPES = ("action_made",)
+# Clients sent to concurrently before yielding back to the event loop
+BROADCAST_BATCH_SIZE = 50
+# How long flip/send frames are held back so bursts of actions go out as one batched frame
+ACTION_COALESCE_WINDOW = 0.02
+# How long activity broadcasts are held back so a burst of joins/reconnects shares one activity frame
+ACTIVITY_COALESCE_WINDOW = 0.05
+# Websocket subprotocol that switches a client to binary MessagePack frames during the handshake
+MSGPACK_SUBPROTOCOL = "penny-v1-msgpack"
+
 connections_by_ip: dict = {}
+# Clients that receive MessagePack binary frames; every other client receives JSON text frames
+msgpack_clients: Set[WebSocket] = set()
+
+
+def encode_message(message: dict) -> str:
+    """Serialize a websocket message; orjson handles datetime and Enum values natively."""
+    return orjson.dumps(message).decode()
+
+
+def _msgpack_default(value: Any) -> Any:
+    """Convert the values orjson serializes natively into MessagePack-friendly ones."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__} to MessagePack")
+
+
+def pack_message(message: dict) -> bytes:
+    """Serialize a websocket message as MessagePack for clients that opted into binary frames."""
+    return msgpack.packb(message, default=_msgpack_default)
+
+
+class EncodedEvent:
+    """A websocket event serialized once per wire format and shared by every client it is sent to."""
+
+    __slots__ = ("message", "_text", "_packed")
+
+    def __init__(self, message: dict, text: Optional[str] = None):
+        self.message = message
+        self._text = text  # Callers holding an already encoded form of the message can pass it in
+        self._packed: Optional[bytes] = None
+
+    @property
+    def text(self) -> str:
+        """JSON text frame, encoded on first use."""
+        if self._text is None:
+            self._text = encode_message(self.message)
+        return self._text
+
+    @property
+    def packed(self) -> bytes:
+        """MessagePack binary frame, encoded on first use."""
+        if self._packed is None:
+            self._packed = pack_message(self.message)
+        return self._packed
+
+
+def encode_event(message: Union[dict, EncodedEvent]) -> EncodedEvent:
+    """Wrap a message so it is serialized at most once, however many sockets and broadcasts reuse it."""
+    return message if isinstance(message, EncodedEvent) else EncodedEvent(message)
+
+
+# State change frames never vary, so each is encoded once for the lifetime of the process
+GAME_STATE_EVENTS = {state: EncodedEvent({"type": "game_state", "state": state.value}) for state in GameState}
+
+
+def delta_encode_action(room_id: str, action_data: dict) -> dict:
+    """
+    Reduce an action frame to the per-player entries that changed since the room's previous action frame.
+
+    Any other frame broadcast to the room drops the delta base, so the next action frame is sent in full.
+    Clients connecting mid-round always receive an activity broadcast first and therefore never miss a base.
+    """
+    previous = action_snapshots.get(room_id)
+    current = {
+        field: {key: list(value) if isinstance(value, list) else value for key, value in action_data[field].items()}
+        for field in ACTION_DELTA_FIELDS
+    }
+    current["seq"] = previous["seq"] + 1 if previous else 1
+    action_snapshots[room_id] = current
+
+    message = {**action_data, "seq": current["seq"]}
+    if previous is None or any(previous[field].keys() != current[field].keys() for field in ACTION_DELTA_FIELDS):
+        message["delta"] = False
+        # action_data only holds shallow copies of the game's maps, and the frame is encoded when the batch is
+        # flushed; send the lists copied above so later flips cannot leak into this frame
+        for field in ACTION_DELTA_FIELDS:
+            message[field] = current[field]
+    else:
+        message["delta"] = True
+        message["base_seq"] = previous["seq"]
+        for field in ACTION_DELTA_FIELDS:
+            message[field] = {key: value for key, value in current[field].items() if previous[field][key] != value}
+
+    # Packed batches are only expanded for the players actually on the wire
+    message["sent_coins"] = format_sent_coins(message["sent_coins"])
+    return message
+
+
+def batched_frame(events: List[EncodedEvent]) -> str:
+    """Join already encoded events into one batched text frame without serializing them again."""
+    return '{"type":"batched","events":[%s]}' % ",".join(event.text for event in events)
+
+
+# MessagePack prefix of {"type": "batched", "events": [...]}, up to the array header
+_PACKED_BATCH_PREFIX = b"\x82" + msgpack.packb("type") + msgpack.packb("batched") + msgpack.packb("events")
+
+
+def packed_batched_frame(events: List[EncodedEvent]) -> bytes:
+    """MessagePack counterpart of batched_frame, concatenating the already packed events."""
+    header = msgpack.Packer().pack_array_header(len(events))
+    return b"".join((_PACKED_BATCH_PREFIX, header, *(event.packed for event in events)))
+
+
+async def send_event(client: WebSocket, event: EncodedEvent) -> None:
+    """Send a single event to a client in the wire format it asked for."""
+    if client in msgpack_clients:
+        await client.send_bytes(event.packed)
+    else:
+        await client.send_text(event.text)
 
 
-class DateTimeEncoder(json.JSONEncoder):
-    """Custom JSON encoder for datetime objects."""
+class BroadcastCoalescer:
+    """Collects events per room and broadcasts them as a single batched frame once a short window elapses."""
 
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+    def __init__(self, window: float):
+        self.window = window
+        self._pending: Dict[str, List[Union[dict, EncodedEvent]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._flushes: Set[asyncio.Task] = set()
+
+    def schedule(self, room_id: str, *messages: Union[dict, EncodedEvent]) -> None:
+        """Queue events for the room, arming the flush timer on the first schedule of a window."""
+        self._pending.setdefault(room_id, []).extend(messages)
+        if room_id not in self._timers:
+            self._timers[room_id] = asyncio.get_running_loop().call_later(self.window, self._start_flush, room_id)
+
+    def _start_flush(self, room_id: str) -> None:
+        """Run a flush from the timer callback, keeping a reference until the task finishes."""
+        task = asyncio.create_task(self.flush(room_id))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    def take(self, room_id: str) -> Optional[List[Union[dict, EncodedEvent]]]:
+        """Remove and return the room's pending events (None if nothing was scheduled), disarming its flush timer."""
+        timer = self._timers.pop(room_id, None)
+        if timer:
+            timer.cancel()
+        return self._pending.pop(room_id, None)
+
+    async def flush(self, room_id: str) -> None:
+        """Broadcast the room's pending events now, as a single frame."""
+        await WebSocketManager.broadcast_to_room(room_id)
+
+
+action_coalescer = BroadcastCoalescer(ACTION_COALESCE_WINDOW)
+activity_coalescer = BroadcastCoalescer(ACTIVITY_COALESCE_WINDOW)
+
+
+def build_activity_message(room_id: str) -> Optional[dict]:
+    """Build the room's current user activity status, or None once the game is gone."""
+    game = get_game(room_id)
+    if not game:
+        return None
+
+    # Get online status of all users (players + spectators + host)
+    online = online_users.get(room_id, set())
+    activity = {user: (user in online) for user in game.member_names()}
+
+    logger.debug(
+        "Activity broadcast for room %s: players=%s, spectators=%s, host=%s",
+        room_id,
+        game.players,
+        game.spectators,
+        game.host,
+    )
+    return {
+        "type": "activity",
+        "players": game.players,
+        "spectators": game.spectators,
+        "host": game.host,
+        "activity": activity,
+    }
+
+
+def take_pending_events(room_id: str) -> List[Union[dict, EncodedEvent]]:
+    """Collect the room's coalesced events: a fresh activity frame and its updates first, then queued actions."""
+    pending = []
+    activity_updates = activity_coalescer.take(room_id)
+    if activity_updates is not None:
+        activity = build_activity_message(room_id)
+        if activity:
+            pending.append(activity)
+        pending.extend(activity_updates)
+    pending.extend(action_coalescer.take(room_id) or ())
+    return pending
 
 
 class WebSocketManager:
     """Manages WebSocket connections and broadcasting."""
 
     @staticmethod
-    async def broadcast_game_state(room_id: str, state) -> None:
-        """Broadcast game state change to all clients in the room."""
-        msg = {"type": "game_state", "state": state.value}
-        await WebSocketManager.broadcast_to_room(room_id, msg)
+    async def broadcast_game_state(room_id: str, state: GameState, *updates: Union[dict, EncodedEvent]) -> None:
+        """Broadcast game state change to all clients in the room, followed by the updates that go with it."""
+        await WebSocketManager.broadcast_to_room(room_id, GAME_STATE_EVENTS[state], *updates)
 
     @staticmethod
-    async def broadcast_game_update(room_id: str, update_data: dict) -> None:
+    async def broadcast_game_update(room_id: str, update_data: Union[dict, EncodedEvent]) -> None:
         """Broadcast game updates (moves, turns, etc.) to all clients in the room."""
         await WebSocketManager.broadcast_to_room(room_id, update_data)
 
     @staticmethod
-    async def broadcast_to_room(room_id: str, message: dict) -> None:
-        """Broadcast a message to all websocket clients in a room."""
-        if room_id not in rooms:
+    async def broadcast_action(room_id: str, action_data: dict) -> None:
+        """Queue a flip/send action frame, delta-encoded against the previous action frame, for the next batch."""
+        action_coalescer.schedule(room_id, delta_encode_action(room_id, action_data))
+
+    @staticmethod
+    async def broadcast_to_room(room_id: str, *messages: Union[dict, EncodedEvent]) -> None:
+        """Broadcast messages, in order and as a single frame, to all websocket clients in a room."""
+        # Queued activity and actions happened before these messages, so they lead the same frame
+        events = [encode_event(message) for message in (*take_pending_events(room_id), *messages)]
+        if not events:
             return
 
-        # Use custom encoder to handle datetime objects
-        message_str = json.dumps(message, cls=DateTimeEncoder)
-        disconnected_clients = []
+        if any(event.message.get("type") not in DELTA_FRAME_TYPES for event in events):
+            action_snapshots.pop(room_id, None)
 
-        for client in rooms[room_id]:
-            try:
-                await client.send_text(message_str)
-            except Exception as e:
-                logger.warning(f"Failed to send message to client in room {room_id}: {e}")
-                disconnected_clients.append(client)
+        if room_id not in rooms:
+            return
+
+        clients = list(rooms[room_id])
+
+        # Only encode the wire formats that someone in the room actually receives
+        frame = packed = None
+        if any(client not in msgpack_clients for client in clients):
+            frame = events[0].text if len(events) == 1 else batched_frame(events)
+        if not msgpack_clients.isdisjoint(clients):
+            packed = events[0].packed if len(events) == 1 else packed_batched_frame(events)
+
+        # Send to every client concurrently so one slow socket does not delay the rest, yielding to the
+        # event loop between batches so a very large room cannot starve request handling
+        results = []
+        for start in range(0, len(clients), BROADCAST_BATCH_SIZE):
+            if start:
+                await asyncio.sleep(0)
+            batch = clients[start : start + BROADCAST_BATCH_SIZE]
+            sends = (
+                client.send_bytes(packed) if client in msgpack_clients else client.send_text(frame) for client in batch
+            )
+            results += await asyncio.gather(*sends, return_exceptions=True)
 
         # Remove disconnected clients
-        for client in disconnected_clients:
-            if client in rooms[room_id]:
-                rooms[room_id].remove(client)
+        for client, result in zip(clients, results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to send message to client in room %s: %s", room_id, result)
+                if client in rooms.get(room_id, ()):
+                    rooms[room_id].remove(client)
 
     @staticmethod
-    async def broadcast_activity(room_id: str) -> None:
-        """Broadcast user activity status to all clients in the room."""
-        game = get_game(room_id)
-        if not game:
-            return
-
-        # Get all users (players + spectators + host)
-        users = set(game.players + game.spectators)
-        if game.host:
-            users.add(game.host)
-
-        # Get online status
-        online = online_users.get(room_id, set())
-        activity = {user: (user in online) for user in users}
-
-        msg = {
-            "type": "activity",
-            "players": game.players,
-            "spectators": game.spectators,
-            "host": game.host,
-            "activity": activity,
-        }
-
-        await WebSocketManager.broadcast_to_room(room_id, msg)
-        logger.debug(
-            f"Activity broadcast for room {room_id}: "
-            f"players={game.players}, spectators={game.spectators}, host={game.host}"
-        )
+    async def broadcast_activity(room_id: str, *updates: Union[dict, EncodedEvent]) -> None:
+        """Queue a user activity broadcast followed by its updates; a burst within the window shares one frame."""
+        # The activity frame resets the delta base, so later actions must not be encoded against the current one
+        action_snapshots.pop(room_id, None)
+        activity_coalescer.schedule(room_id, *updates)
 
     @staticmethod
     async def send_welcome_message(websocket: WebSocket, room_id: str, username: str) -> None:
@@ -128,19 +327,17 @@ class WebSocketManager:
                 "state": game.state.value,
                 "batch_size": game.batch_size,
                 "player_coins": game.player_coins,
-                "sent_coins": game.sent_coins,
+                "sent_coins": format_sent_coins(game.sent_coins),
                 "total_completed": get_total_completed_coins(game),
                 "tails_remaining": get_tails_count(game),
             },
         }
 
         try:
-            # Use custom encoder for datetime serialization
-            welcome_str = json.dumps(welcome_msg, cls=DateTimeEncoder)
-            await websocket.send_text(welcome_str)
-            logger.info(f"Welcome message sent to {username} in room {room_id}")
+            await send_event(websocket, EncodedEvent(welcome_msg))
+            logger.info("Welcome message sent to %s in room %s", username, room_id)
         except Exception as e:
-            logger.warning(f"Failed to send welcome message to {username} in room {room_id}: {e}")
+            logger.warning("Failed to send welcome message to %s in room %s: %s", username, room_id, e)
 
 
 class ConnectionManager:
@@ -156,10 +353,7 @@ class ConnectionManager:
     @staticmethod
     def add_client_to_room(room_id: str, websocket: WebSocket, username: str) -> None:
         """Add a client to a room and track them as online."""
-        if room_id not in rooms:
-            rooms[room_id] = []
-
-        rooms[room_id].append(websocket)
+        rooms.setdefault(room_id, []).append(websocket)
 
         client_ip = websocket.client.host if websocket.client else "unknown"
         connections_by_ip[client_ip] = connections_by_ip.get(client_ip, 0) + 1
@@ -193,7 +387,7 @@ class ConnectionManager:
 async def handle_client_message(room_id: str, username: str, message: str) -> None:
     """Handle incoming messages from clients."""
     try:
-        data = json.loads(message)
+        data = orjson.loads(message)
         msg_type = data.get("type", "chat")
 
         if msg_type == "chat":
@@ -204,12 +398,12 @@ async def handle_client_message(room_id: str, username: str, message: str) -> No
             pass
         # Add more message types as needed
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         # Handle as plain text chat message for backward compatibility
         chat_msg = f"{username}: {message}"
         await WebSocketManager.broadcast_to_room(room_id, {"type": "chat", "message": chat_msg})
     except Exception as e:
-        logger.error(f"Error handling client message from {username} in room {room_id}: {e}")
+        logger.error("Error handling client message from %s in room %s: %s", username, room_id, e)
 
 
 async def _handle_chat_message(room_id: str, username: str, data: dict) -> None:
@@ -254,7 +448,7 @@ async def _handle_host_disconnect(room_id: str, username: str) -> None:
         try:
             await ws.close(code=CLOSE_CODE_HOST_LEFT, reason="Host left, room closed")
         except Exception as e:
-            logger.warning(f"Error closing websocket: {e}")
+            logger.warning("Error closing websocket: %s", e)
 
     # Remove the game
     remove_game(room_id)
@@ -306,19 +500,21 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str, username: str)
         session_token = websocket.query_params.get("token")
 
     if not session_token:
-        logger.warning(f"No session token provided for {username} in room {room_id}")
+        logger.warning("No session token provided for %s in room %s", username, room_id)
         await websocket.close(code=CLOSE_CODE_UNAUTHORIZED, reason="Missing session token")
         return
 
     if not validate_session_token(game, username, session_token):
-        logger.warning(f"Invalid session token for {username} in room {room_id}")
+        logger.warning("Invalid session token for %s in room %s", username, room_id)
         await websocket.close(code=CLOSE_CODE_UNAUTHORIZED, reason="Invalid session token")
         return
 
-    if room_id not in rooms:
-        rooms[room_id] = []
-
-    await websocket.accept()
+    # Binary frames are opt-in through the handshake subprotocol
+    if MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", ()):
+        await websocket.accept(subprotocol=MSGPACK_SUBPROTOCOL)
+        msgpack_clients.add(websocket)
+    else:
+        await websocket.accept()
 
     # Add client to room
     ConnectionManager.add_client_to_room(room_id, websocket, username)
@@ -332,7 +528,7 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str, username: str)
 
         # Determine if this is a reconnection and broadcast accordingly
         game = get_game(room_id)
-        is_reconnection = game and (username in game.players or username in game.spectators or username == game.host)
+        is_reconnection = game and game.has_member(username)
 
         await _broadcast_user_connect(room_id, username, is_reconnection)
 
@@ -342,25 +538,27 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str, username: str)
                 data = await websocket.receive_text()
                 if len(data) > MAX_MESSAGE_SIZE:
                     logger.warning(
-                        f"Closing connection for {username} in {room_id}: message too large ({len(data)} bytes)"
+                        "Closing connection for %s in %s: message too large (%s bytes)", username, room_id, len(data)
                     )
                     await websocket.close(code=CLOSE_CODE_MESSAGE_TOO_LARGE, reason="Message too large")
                     break
                 await handle_client_message(room_id, username, data)
             except Exception as e:
-                logger.warning(f"Error receiving message from {username} in room {room_id}: {e}")
+                logger.warning("Error receiving message from %s in room %s: %s", username, room_id, e)
                 break
 
     except WebSocketDisconnect:
         pass
     except Exception as e:
-        logger.error(f"Unexpected error in websocket for {username} in room {room_id}: {e}")
+        logger.error("Unexpected error in websocket for %s in room %s: %s", username, room_id, e)
     finally:
         # Clean up on disconnect
+        msgpack_clients.discard(websocket)
         await handle_disconnect(websocket, room_id, username)
 
 
 # Export the main functions that other modules need
 broadcast_game_state = WebSocketManager.broadcast_game_state
 broadcast_game_update = WebSocketManager.broadcast_game_update
+broadcast_action = WebSocketManager.broadcast_action
 broadcast_activity = WebSocketManager.broadcast_activity
@@ -0,0 +1,28 @@
+import logging
+
+from fastapi.testclient import TestClient
+
+from app.main import ALLOWED_ORIGINS, create_app
+
+
+def _app_with_failing_route():
+    app = create_app()
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return app
+
+
+def test_unexpected_error_keeps_cors_headers(caplog):
+    client = TestClient(_app_with_failing_route())
+    origin = ALLOWED_ORIGINS[0]
+
+    with caplog.at_level(logging.ERROR):
+        response = client.get("/boom", headers={"Origin": origin})
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Internal server error"}
+    assert response.headers["access-control-allow-origin"] == origin
+    assert len([r for r in caplog.records if r.exc_info]) == 1
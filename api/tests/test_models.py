@@ -0,0 +1,20 @@
+import pytest
+from pydantic import ValidationError
+
+from app.constants import VALID_BATCH_SIZES
+from app.models import RoundConfigRequest
+
+
+def _round_config(selected_batch_size):
+    return RoundConfigRequest(round_type="single", required_players=2, selected_batch_size=selected_batch_size)
+
+
+@pytest.mark.parametrize("batch_size", VALID_BATCH_SIZES)
+def test_round_config_accepts_valid_batch_sizes(batch_size):
+    assert _round_config(batch_size).selected_batch_size == batch_size
+
+
+@pytest.mark.parametrize("batch_size", [0, 4, True, "5"])
+def test_round_config_rejects_invalid_batch_sizes(batch_size):
+    with pytest.raises(ValidationError):
+        _round_config(batch_size)
@@ -0,0 +1,86 @@
+import json
+
+import msgpack
+from fastapi.testclient import TestClient
+
+from app.game_logic import action_snapshots, remove_game
+from app.main import app
+from app.websocket import MSGPACK_SUBPROTOCOL, delta_encode_action
+
+
+def _action(player_coins):
+    return {"player_coins": player_coins.copy(), "sent_coins": {}, "player_timers": {}}
+
+
+def test_full_action_frame_is_not_changed_by_later_flips():
+    room_id = "TESTFULL"
+    player_coins = {"alice": [False, False], "bob": []}
+
+    try:
+        message = delta_encode_action(room_id, _action(player_coins))
+        player_coins["alice"][0] = True
+
+        assert message["delta"] is False
+        assert message["player_coins"] == {"alice": [False, False], "bob": []}
+    finally:
+        action_snapshots.pop(room_id, None)
+
+
+def test_delta_action_frame_only_carries_changed_players():
+    room_id = "TESTDELTA"
+    player_coins = {"alice": [False, False], "bob": []}
+
+    try:
+        first = delta_encode_action(room_id, _action(player_coins))
+        player_coins["alice"][0] = True
+        second = delta_encode_action(room_id, _action(player_coins))
+
+        assert second["delta"] is True
+        assert second["base_seq"] == first["seq"]
+        assert second["player_coins"] == {"alice": [True, False]}
+    finally:
+        action_snapshots.pop(room_id, None)
+
+
+def _joined_player(client):
+    room_id = client.post("/game/create").json()["room_id"]
+    session_token = client.post(f"/game/join/{room_id}", json={"username": "alice"}).json()["session_token"]
+    return room_id, f"/ws/{room_id}/alice?token={session_token}"
+
+
+def test_msgpack_subprotocol_switches_to_binary_frames():
+    client = TestClient(app)
+    room_id, url = _joined_player(client)
+
+    try:
+        with client.websocket_connect(url, subprotocols=[MSGPACK_SUBPROTOCOL]) as ws:
+            assert ws.accepted_subprotocol == MSGPACK_SUBPROTOCOL
+            assert msgpack.unpackb(ws.receive_bytes())["type"] == "welcome"
+    finally:
+        remove_game(room_id)
+
+
+def test_clients_without_subprotocol_receive_json_text_frames():
+    client = TestClient(app)
+    room_id, url = _joined_player(client)
+
+    try:
+        with client.websocket_connect(f"{url}&format=msgpack") as ws:
+            assert ws.accepted_subprotocol is None
+            assert json.loads(ws.receive_text())["type"] == "welcome"
+    finally:
+        remove_game(room_id)
+
+
+def test_public_state_reports_the_action_seq_to_resync_from():
+    client = TestClient(app)
+    room_id, _ = _joined_player(client)
+
+    try:
+        delta_encode_action(room_id, _action({"alice": []}))
+        state = client.get(f"/game/state/{room_id}").json()
+
+        assert state["action_seq"] == 1
+        assert state["sent_coins"] == {}
+    finally:
+        remove_game(room_id)
@@ -1,6 +1,6 @@
 import { renderPlayers, renderSpectators, updateRoundConfiguration, updatePlayerCountDisplay } from './dom.js'
 import { addDnDEvents } from './dnd.js'
-import { renderGameBoard } from './game-board.js'
+import { fetchBoardGameState, renderGameBoard } from './game-board.js'
 import { showNotification } from './utility.js'
 import { ViewManager } from './view-manager.js'
 import { TimeUtils } from './time-utils.js'
@@ -445,58 +445,64 @@ export function handleWSMessage(data) {
             return
         }
 
-        const msg = JSON.parse(data)
-
-        switch (msg.type) {
-            case 'welcome':
-                handleWelcomeMessage(msg)
-                break
-            case 'game_state':
-                handleGameStateChange(msg)
-                break
-            case 'action_made':
-                handleActionMade(msg)
-                break
-            case 'game_started':
-                handleGameStarted(msg)
-                break
-            case 'round_started':
-                handleRoundStarted(msg)
-                break
-            case 'round_complete':
-                handleRoundComplete(msg)
-                break
-            case 'game_over':
-                handleGameOver(msg)
-                break
-            case 'game_reset':
-                handleGameReset(msg)
-                break
-            case 'round_config_update':
-                handleRoundConfigUpdate(msg)
-                break
-            case 'activity':
-                handleActivityUpdate(msg)
-                break
-            case 'user_joined':
-                handleUserJoined(msg)
-                break
-            case 'user_connected':
-            case 'user_reconnected':
-            case 'user_disconnected':
-                handleUserStatusChange(msg)
-                break
-            case 'host_disconnected':
-                handleHostDisconnected(msg)
-                break
-            default:
-                console.debug('Unknown message type:', msg.type, msg)
-        }
+        dispatchMessage(JSON.parse(data))
     } catch (error) {
         console.error('Error parsing WS message:', error, data)
     }
 }
 
+function dispatchMessage(msg) {
+    switch (msg.type) {
+        case 'batched':
+            // Coalesced flip/send frames, applied in the order they were produced
+            msg.events.forEach(dispatchMessage)
+            break
+        case 'welcome':
+            handleWelcomeMessage(msg)
+            break
+        case 'game_state':
+            handleGameStateChange(msg)
+            break
+        case 'action_made':
+            handleActionMade(msg)
+            break
+        case 'game_started':
+            handleGameStarted(msg)
+            break
+        case 'round_started':
+            handleRoundStarted(msg)
+            break
+        case 'round_complete':
+            handleRoundComplete(msg)
+            break
+        case 'game_over':
+            handleGameOver(msg)
+            break
+        case 'game_reset':
+            handleGameReset(msg)
+            break
+        case 'round_config_update':
+            handleRoundConfigUpdate(msg)
+            break
+        case 'activity':
+            handleActivityUpdate(msg)
+            break
+        case 'user_joined':
+            handleUserJoined(msg)
+            break
+        case 'user_connected':
+        case 'user_reconnected':
+        case 'user_disconnected':
+            handleUserStatusChange(msg)
+            break
+        case 'host_disconnected':
+            handleHostDisconnected(msg)
+            break
+        default:
+            console.debug('Unknown message type:', msg.type, msg)
+    }
+}
+
 function handleWelcomeMessage(msg) {
     const gameState = msg.game_state
     if (gameState) {
@@ -662,18 +668,63 @@ function handleGameStateChange(msg) {
     }
 }
 
+// Action frames received while a resync is in flight, replayed once the fetched base is in place
+let actionResyncQueue = null
+
+async function resyncActionFrames(msg) {
+    // Rebuild the missed base from the HTTP state, which reports the seq of the last action it includes
+    actionResyncQueue = [msg]
+    const state = await fetchBoardGameState(window.currentRoomId)
+    const [first, ...queued] = actionResyncQueue
+    actionResyncQueue = null
+    if (!state) return
+
+    handleActionMade({
+        ...first,
+        delta: false,
+        seq: state.action_seq,
+        player_coins: state.player_coins,
+        sent_coins: state.sent_coins,
+        player_timers: state.player_timers,
+        total_completed: state.total_completed,
+    })
+    queued.forEach((frame) => handleActionMade(frame))
+}
+
 function handleActionMade(msg) {
+    if (actionResyncQueue) {
+        actionResyncQueue.push(msg)
+        return
+    }
+
+    // Delta frames only carry the per-player entries that changed since the previous action frame
+    const previous = window.gameState || {}
+    if (msg.delta && msg.seq <= previous.action_seq) {
+        // Already part of the state fetched during the last resync
+        return
+    }
+    if (msg.delta && msg.base_seq !== previous.action_seq) {
+        // Patching a different base would show a wrong board, so resync from the server instead
+        console.warn(`⚠️ Action delta based on seq ${msg.base_seq}, last applied seq ${previous.action_seq}`)
+        resyncActionFrames(msg)
+        return
+    }
+    const playerCoins = msg.delta ? { ...previous.player_coins, ...msg.player_coins } : msg.player_coins
+    const sentCoins = msg.delta ? { ...previous.sent_coins, ...msg.sent_coins } : msg.sent_coins
+    const playerTimers = msg.delta ? { ...previous.player_timers, ...msg.player_timers } : msg.player_timers || {}
+
     // Create a mock game state from the message data with timer information
     const gameState = {
         players: window.gameState?.players || [],
         batch_size: window.gameState?.batch_size || TOTAL_COINS,
-        player_coins: msg.player_coins,
-        sent_coins: msg.sent_coins,
+        player_coins: playerCoins,
+        sent_coins: sentCoins,
         total_completed: msg.total_completed,
-        tails_remaining: calculateTailsRemaining(msg.player_coins),
+        tails_remaining: calculateTailsRemaining(playerCoins),
         state: msg.state,
         current_round: msg.current_round,
-        player_timers: msg.player_timers || {},
+        action_seq: msg.seq,
+        player_timers: playerTimers,
         game_duration_seconds: msg.game_duration_seconds,
         lead_time_seconds: msg.lead_time_seconds,
         first_flip_at: msg.first_flip_at,
@@ -721,7 +772,7 @@ function handleActionMade(msg) {
                     round_number: msg.current_round,
                     batch_size: window.gameState?.batch_size || TOTAL_COINS,
                     game_duration_seconds: msg.game_duration_seconds,
-                    player_timers: msg.player_timers || {},
+                    player_timers: playerTimers,
                     total_completed: msg.total_completed,
                     started_at: window.gameState?.started_at,
                     ended_at: new Date().toISOString(),
@@ -1827,8 +1878,9 @@ export function connectWebSocket(apiUrl, roomId, username) {
         return
     }
 
-    // Store username globally for later use
+    // Store username and room globally for later use
     window.currentUsername = username
+    window.currentRoomId = roomId
 
     const sessionToken = getSessionToken()
     console.log('📋 Token lookup result:', { hasToken: !!sessionToken, tokenLength: sessionToken?.length || 0 })